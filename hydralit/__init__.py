@@ -4,5 +4,10 @@ __author__ = 'Jackson Storm'
 
 from hydralit.hydra_app import HydraApp
 from hydralit.app_template import HydraHeadApp
+from hydralit.session_schema import SessionParam
+from hydralit.leak_report_app import LeakReportApp
+from hydralit.progressive import Section
+from hydralit.tenants import TenantConfig, TenantRegistry
+from hydralit.auth import AuthBackend
 
 from streamlit import *
\ No newline at end of file
@@ -0,0 +1,231 @@
+import collections
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    A thread safe token bucket, tokens are added at a constant rate up to the capacity of the bucket.
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Parameters
+        ------------
+        rate: float
+            The number of tokens added to the bucket per second.
+        capacity: float
+            The maximum number of tokens the bucket can hold, this is the largest burst that will be allowed.
+        """
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, tokens=1):
+        """
+        Take tokens from the bucket.
+
+        Returns
+        ---------
+        bool: True if the tokens were available and have been taken.
+        """
+
+        with self._lock:
+            self._refill(time.monotonic())
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+
+            return False
+
+    def give(self, tokens=1):
+        """
+        Return tokens to the bucket, such as a reservation that turned out not to be needed.
+        """
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def is_full(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens >= self.capacity
+
+    def wait_time(self, tokens=1):
+        """
+        Return the number of seconds until the tokens will be available.
+        """
+
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+
+class KeyedRateLimiter(object):
+    """
+    A collection of token buckets, one for each key (a user or an ip address), each key is allowed a number of calls within each period of seconds.
+    """
+
+    def __init__(self, calls, period, max_keys=10000):
+        self.calls = calls
+        self.period = float(period)
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                if len(self._buckets) >= self.max_keys:
+                    # full buckets carry no state, so they are safe to forget
+                    for k in [k for k, b in self._buckets.items() if b.is_full()]:
+                        del self._buckets[k]
+
+                bucket = self._buckets.setdefault(key, TokenBucket(self.calls / self.period, self.calls))
+
+        return bucket
+
+    def allow(self, key, tokens=1):
+        return self._get_bucket(key).take(tokens)
+
+    def refund(self, key, tokens=1):
+        self._get_bucket(key).give(tokens)
+
+    def retry_in(self, key, tokens=1):
+        return self._get_bucket(key).wait_time(tokens)
+
+
+class AdmissionQueue(object):
+    """
+    A process wide first in, first out admission gate that limits the number of concurrent runs of an app.
+    """
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._waiting = collections.deque()
+        self._cond = threading.Condition()
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def waiting(self):
+        return len(self._waiting)
+
+    def acquire(self, timeout=None, on_wait=None, poll_interval=0.5):
+        """
+        Wait for a run slot.
+
+        Parameters
+        ------------
+        timeout: float, None
+            The maximum number of seconds to wait in the queue, if None, wait forever.
+        on_wait: callable, None
+            Called with the current queue position (1 is next in line) whenever the position changes while waiting.
+        poll_interval: float, 0.5
+            How often the queue position is re-checked while waiting.
+
+        Returns
+        ---------
+        bool: True if a slot was acquired, the caller must call release() when the run has finished, False if the timeout expired.
+        """
+
+        ticket = object()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_position = None
+
+        with self._cond:
+            self._waiting.append(ticket)
+
+            try:
+                while True:
+                    position = self._waiting.index(ticket) + 1
+
+                    if position == 1 and self._active < self.max_concurrent:
+                        self._waiting.popleft()
+                        self._active += 1
+                        # the next in line may also fit
+                        self._cond.notify_all()
+                        return True
+
+                    if on_wait is not None and position != last_position:
+                        last_position = position
+                        # release the lock while the caller updates the display
+                        self._cond.release()
+                        try:
+                            on_wait(position)
+                        finally:
+                            self._cond.acquire()
+                        continue
+
+                    wait_for = poll_interval
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._waiting.remove(ticket)
+                            self._cond.notify_all()
+                            return False
+                        wait_for = min(wait_for, remaining)
+
+                    self._cond.wait(wait_for)
+            except BaseException:
+                # interrupted (a Streamlit stop or rerun) while waiting, give up our place in the queue
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    self._cond.notify_all()
+                raise
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+
+# process wide admission gates and rate limiters, keyed by the scope of the HydraApp (its tenant and title) and the registered app name
+_QUEUES = {}
+_RATE_LIMITERS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_admission_queue(app_name, max_concurrent, scope=None):
+    """
+    Return the process wide admission queue for the app, creating it if needed, the scope keeps apps of the same name apart, such as the same app served by different tenants.
+    """
+
+    key = (scope, app_name)
+    queue = _QUEUES.get(key)
+    if queue is None:
+        with _REGISTRY_LOCK:
+            queue = _QUEUES.setdefault(key, AdmissionQueue(max_concurrent))
+
+    queue.max_concurrent = max_concurrent
+    return queue
+
+
+def get_rate_limiter(app_name, calls, period, scope=None):
+    """
+    Return the process wide per-user rate limiter for the app, creating it if needed, the scope keeps apps of the same name apart, such as the same app served by different tenants.
+    """
+
+    key = (scope, app_name)
+    limiter = _RATE_LIMITERS.get(key)
+    if limiter is None or limiter.calls != calls or limiter.period != float(period):
+        with _REGISTRY_LOCK:
+            limiter = _RATE_LIMITERS.get(key)
+            if limiter is None or limiter.calls != calls or limiter.period != float(period):
+                limiter = KeyedRateLimiter(calls, period)
+                _RATE_LIMITERS[key] = limiter
+
+    return limiter
@@ -9,6 +9,8 @@ import compress_pickle as cp
 import base64
 import streamlit as st
 import pandas as pd
+from hydralit.data_view import get_paged_frame
+from hydralit.progressive import render_sections
 
 
 class HydraHeadApp(ABC):
@@ -25,6 +27,54 @@ class HydraHeadApp(ABC):
         pass
 
 
+    def prepare(self):
+        """
+        An optional hook to load the data this app needs, the parent app calls this method just before run() each time the app is shown.
+
+        When the app is shown as a panel of a composite view, the prepare() methods of all the panels are run concurrently in the shared worker pool before each panel is drawn. They run with the session's script run context, so st.cache_data and the session state can be used, but this method must not call any Streamlit display elements, keep the loaded data on the instance for run() to use.
+        """
+
+        pass
+
+
+    def sections(self):
+        """
+        An optional hook to declare the page as a list of hydralit.Section objects, so the loader app can draw a skeleton for every section straight away and fill each one in as soon as its data is ready, rather than showing a full page loader until the whole app has run.
+
+        Apps that declare sections should implement run() as a call to self.render_sections(), which is used when the loader app is turned off.
+
+        Returns
+        ---------
+        list of Section, or None if the app draws the page itself in run().
+        """
+
+        return None
+
+
+    def render_sections(self, sections=None):
+        """
+        Draw the sections of the page progressively, the skeletons are drawn first, then the sections without any data to load, then every other section as soon as its own data has loaded.
+
+        Parameters
+        ------------
+        sections: list of Section, None
+            The sections to draw, if None the sections returned by sections() are used.
+
+        """
+
+        render_sections(sections if sections is not None else self.sections() or [])
+
+
+    def warmup(self):
+        """
+        An optional hook for expensive one-off initialization, such as loading models or reference data, run at process start when the parent app calls HydraApp.warmup().
+
+        The hooks of all the apps run concurrently in a thread pool before any session is attached, so this method must not call any Streamlit elements or use the session state. Child app instances are recreated on every rerun, keep whatever is loaded in a process wide store (a class attribute, a dataset added with add_dataset or a Streamlit resource cache) rather than on the instance.
+        """
+
+        pass
+
+
     def assign_session(self,session_state, parent_app):
         """
         This method is called when the app is added to a Hydralit application to gain access to the global session state.
@@ -61,6 +111,76 @@ class HydraHeadApp(ABC):
         self.session_state.current_user = access_user
 
 
+    def user_cached(self, key, func, *args, ttl=None, **kwargs):
+        """
+        Return a result cached for the current user, access level and app, calling func(*args, **kwargs) to compute it if needed. The cached results are dropped when the user logs in or out, or the session switches to a different user.
+
+        Parameters
+        ------------
+        key: hashable
+            The name of the result within this app.
+        func: callable
+            The function that computes the result.
+        ttl: float, None
+            The number of seconds the result is valid for, None for no expiry.
+
+        """
+
+        return self.parent_app.cached_for_user(key, func, *args, ttl=ttl, **kwargs)
+
+
+    def trace_span(self, name, **attributes):
+        """
+        Return a context manager that records a span for an operation within this app, as part of the trace of the current run. If tracing is off, the span does nothing.
+
+        Parameters
+        ------------
+        name: str
+            The name of the operation.
+        attributes:
+            Attributes to record on the span.
+
+        """
+
+        return self.parent_app.trace_span(name, **attributes)
+
+
+    def authenticate(self, username, password):
+        """
+        Check the credentials with the authentication backend of the parent app, for use in a login app. On success the access is set for the session and the login callback is run, so only the redirect is left to do.
+
+        Parameters
+        ------------
+        username: str
+            The username entered.
+        password: str
+            The password entered.
+
+        Returns
+        ---------
+        AuthResult: the outcome of the attempt, see HydraApp.authenticate.
+
+        """
+
+        return self.parent_app.authenticate(username, password)
+
+
+    def get_session_value(self, key, default=None):
+        """
+        Return a value from the session store, reading it back from disk if it was spilled to keep within the memory budget. Session parameters declared as spillable must be read this way.
+
+        Parameters
+        ------------
+        key: str
+            The session store key.
+        default: object, None
+            The value to return if the key is not in the session store.
+
+        """
+
+        return self.parent_app.get_session_value(key, default)
+
+
     def check_access(self):
         """
         Check the access permission and the assigned user for the running session.
@@ -96,6 +216,9 @@ class HydraHeadApp(ABC):
     def _sneaky_redirect(self,redirect_target_app=None):
 
         if redirect_target_app is not None and validators.url(redirect_target_app):
+            if hasattr(self, 'parent_app'):
+                self.parent_app._log_navigation(redirect_target_app, 'external')
+
             js = "window.open('{}')".format(redirect_target_app)
             html = '<img src onerror="{}">'.format(js)
             div = Div(text=html)
@@ -208,3 +331,64 @@ class HydraHeadApp(ABC):
             parent_container.markdown(dl_link, unsafe_allow_html=True)
         
         return dl_link
+
+
+    def data_view(self, data, key, page_size=200, parent_container=None, refresh=False, **kwargs):
+        """
+        A convenience method to show a large DataFrame one page at a time, with server side sorting and filtering, only the rows of the visible page are sent to the browser.
+
+        The full frame is held once per process under the key, so every session viewing the same key shares a single copy along with its cached sort orders.
+
+        Parameters
+        ------------
+        data: DataFrame or callable
+            The frame to show, or a function that returns the frame, a function is only called when the key has not already been loaded by this process. A frame holding other data than the frame already held under the key raises a ValueError, give data that differs by user a key that includes the user.
+        key: str
+            The unique name of the dataset, also used as the prefix for the widget keys of the paging controls.
+        page_size: int, 200
+            The number of rows to show on each page.
+        parent_container: Streamlit.container
+            The parent container in which to create the view.
+        refresh: bool, False
+            Reload the data, replacing the frame held under the key.
+        kwargs:
+            Keyword arguments to be passed to the Streamlit dataframe method used to show the page.
+
+        Returns
+        ---------
+        DataFrame: the rows of the page being shown.
+        """
+
+        if parent_container is None:
+            parent_container = st
+
+        paged_frame = get_paged_frame(key, data, refresh=refresh)
+        columns = list(paged_frame.df.columns)
+
+        filter_col, text_col, sort_col, order_col = parent_container.columns([2, 3, 2, 1])
+        filter_column = filter_col.selectbox('Filter column', columns, key='{}_filter_column'.format(key))
+        filter_text = text_col.text_input('Contains', key='{}_filter_text'.format(key))
+        sort_by = sort_col.selectbox('Sort by', [None] + columns, key='{}_sort_by'.format(key))
+        ascending = order_col.checkbox('Ascending', value=True, key='{}_ascending'.format(key))
+
+        # find the number of matching rows first, so the page selector can be bounded
+        page_df, total_rows = paged_frame.window(0, page_size, sort_by, ascending, filter_column, filter_text)
+        page_count = max(1, -(-total_rows // page_size))
+
+        page = 1
+        if page_count > 1:
+            # a new filter can leave fewer pages than the one selected before, which the bounded page selector would refuse
+            page_key = '{}_page'.format(key)
+            if st.session_state.get(page_key, 1) > page_count:
+                st.session_state[page_key] = page_count
+
+            page = parent_container.number_input('Page (of {})'.format(page_count), min_value=1, max_value=page_count, step=1, key=page_key)
+            if page > 1:
+                page_df, total_rows = paged_frame.window(page - 1, page_size, sort_by, ascending, filter_column, filter_text)
+
+        parent_container.dataframe(page_df, **kwargs)
+
+        first_row = (page - 1) * page_size + 1 if total_rows > 0 else 0
+        parent_container.caption('Rows {:,} to {:,} of {:,}'.format(first_row, first_row + len(page_df) - 1 if total_rows > 0 else 0, total_rows))
+
+        return page_df
@@ -0,0 +1,319 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from hydralit.admission import KeyedRateLimiter
+
+
+class AuthBackend(object):
+    """
+    The interface of a credential store used by HydraApp.authenticate, subclass this and implement verify().
+
+    Each distinct backend gets its own process wide service, with its own pool, limits and verified credentials. Backends are told apart by their type and their plain configuration values (str, int, float, bool and None attributes), a backend holding any other attribute (such as a database connection or a dict) must name itself with a key attribute, as two such backends can't otherwise be told apart.
+    """
+
+    key = None
+
+    def verify(self, username, password):
+        """
+        Check the credentials of a user, this is called in a worker thread, so it can be slow (such as a password hash or a remote lookup) but must not call any Streamlit elements.
+
+        Returns
+        ---------
+        int or None: The access level to grant the user, or None if the credentials are wrong.
+        """
+
+        raise NotImplementedError
+
+
+class CallableAuthBackend(AuthBackend):
+    """
+    An authentication backend made from a plain verify(username, password) function.
+
+    A module level function is told apart by its name, a lambda, closure, bound method or other callable must be given a key, so backends made by one factory for different stores don't share their verified credentials.
+    """
+
+    def __init__(self, func, key=None):
+        self.func = func
+        self.key = key
+
+    def verify(self, username, password):
+        return self.func(username, password)
+
+
+class AuthResult(object):
+    """
+    The outcome of a login attempt, the status is one of 'ok', 'denied', 'throttled', 'busy', 'timeout' or 'error'.
+    """
+
+    __slots__ = ('status', 'username', 'access_level', 'retry_in', 'error')
+
+    def __init__(self, status, username, access_level=None, retry_in=0.0, error=None):
+        self.status = status
+        self.username = username
+        self.access_level = access_level
+        self.retry_in = retry_in
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def __repr__(self):
+        return 'AuthResult(status={!r}, username={!r}, access_level={!r})'.format(self.status, self.username, self.access_level)
+
+
+class AuthService(object):
+    """
+    Runs the credential checks of an authentication backend in a bounded worker pool shared by every session, keeps the recently verified credentials for a short time so a repeated login skips the slow check, and throttles the failed attempts of each user and each ip address with token buckets.
+    """
+
+    def __init__(self, backend, max_workers=4, max_pending=32, timeout=10.0, session_ttl=300.0, user_failures=(5, 60), ip_failures=(20, 60)):
+        """
+        Parameters
+        ------------
+        backend: AuthBackend or callable
+            The credential store, a plain function taking the username and password is wrapped in a CallableAuthBackend.
+        max_workers: int, 4
+            The number of credential checks run at the same time, so a burst of logins can't take the CPU from everyone else.
+        max_pending: int, 32
+            The most checks running or waiting for a worker, any more are turned away as busy.
+        timeout: float, 10.0
+            The number of seconds a login waits for its check.
+        session_ttl: float, 300.0
+            The number of seconds verified credentials are remembered, 0 to always check.
+        user_failures: tuple, (5, 60)
+            The number of failed attempts allowed for each username within a number of seconds.
+        ip_failures: tuple, (20, 60)
+            The number of failed attempts allowed from each ip address within a number of seconds.
+        """
+
+        self.backend = backend if isinstance(backend, AuthBackend) else CallableAuthBackend(backend)
+        self.options = {'max_workers': max_workers, 'max_pending': max_pending, 'timeout': timeout, 'session_ttl': session_ttl,
+                        'user_failures': tuple(user_failures), 'ip_failures': tuple(ip_failures)}
+        self.timeout = timeout
+        self.session_ttl = session_ttl
+        self.counts = {'ok': 0, 'denied': 0, 'throttled': 0, 'busy': 0, 'timeout': 0, 'error': 0, 'cached': 0}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hydralit-auth')
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._user_limiter = KeyedRateLimiter(*user_failures)
+        self._ip_limiter = KeyedRateLimiter(*ip_failures)
+        self._verified = {}
+        self._lock = threading.Lock()
+        # the verified credentials are only held as salted digests, the salt never leaves the process
+        self._salt = os.urandom(16)
+
+    def _digest(self, username, password):
+        return hashlib.sha256(self._salt + '{}\x00{}'.format(username, password).encode('utf-8')).digest()
+
+    def _lookup(self, digest):
+        with self._lock:
+            entry = self._verified.get(digest)
+            if entry is None:
+                return None
+
+            access_level, expires, _ = entry
+            if expires < time.monotonic():
+                del self._verified[digest]
+                return None
+
+            return access_level
+
+    def _remember(self, digest, username, access_level):
+        now = time.monotonic()
+
+        with self._lock:
+            if len(self._verified) >= 10000:
+                for k in [k for k, entry in self._verified.items() if entry[1] < now]:
+                    del self._verified[k]
+
+            self._verified[digest] = (access_level, now + self.session_ttl, username)
+
+    def forget(self, username=None):
+        """
+        Drop the remembered credentials of the user, or of every user if no username is given, such as after a password change, so the next login is checked by the backend again.
+        """
+
+        with self._lock:
+            if username is None:
+                self._verified.clear()
+            else:
+                for k in [k for k, entry in self._verified.items() if entry[2] == username]:
+                    del self._verified[k]
+
+    def _retry_in(self, username, ip):
+        retry_in = self._user_limiter.retry_in(username)
+        if ip is not None:
+            retry_in = max(retry_in, self._ip_limiter.retry_in(ip))
+
+        return retry_in
+
+    def _reserve(self, username, ip):
+        # take the tokens before the check, so concurrent guesses can't all slip in before the first failure is counted
+        if not self._user_limiter.allow(username):
+            return False
+
+        if ip is not None and not self._ip_limiter.allow(ip):
+            self._user_limiter.refund(username)
+            return False
+
+        return True
+
+    def _refund(self, username, ip):
+        self._user_limiter.refund(username)
+        if ip is not None:
+            self._ip_limiter.refund(ip)
+
+    def _count(self, status):
+        with self._lock:
+            self.counts[status] += 1
+
+    def authenticate(self, username, password, ip=None):
+        """
+        Check the credentials, blocking the calling session until the check has finished or timed out.
+
+        Parameters
+        ------------
+        username: str
+            The username entered.
+        password: str
+            The password entered.
+        ip: str, None
+            The address the attempt came from, None if it is not known.
+
+        Returns
+        ---------
+        AuthResult: the outcome of the attempt.
+        """
+
+        if not self._reserve(username, ip):
+            self._count('throttled')
+            return AuthResult('throttled', username, retry_in=self._retry_in(username, ip))
+
+        # every outcome but a wrong password hands the reserved tokens back, so a user that logs in correctly is never held back
+        digest = self._digest(username, password)
+
+        if self.session_ttl > 0:
+            access_level = self._lookup(digest)
+            if access_level is not None:
+                self._refund(username, ip)
+                self._count('cached')
+                self._count('ok')
+                return AuthResult('ok', username, access_level)
+
+        if not self._pending.acquire(blocking=False):
+            self._refund(username, ip)
+            self._count('busy')
+            return AuthResult('busy', username)
+
+        try:
+            future = self._pool.submit(self.backend.verify, username, password)
+        except BaseException:
+            self._pending.release()
+            self._refund(username, ip)
+            raise
+
+        # the slot is held until the check really finishes, even if this login stops waiting for it
+        future.add_done_callback(lambda f: self._pending.release())
+
+        try:
+            access_level = future.result(timeout=self.timeout)
+        except TimeoutError:
+            self._refund(username, ip)
+            self._count('timeout')
+            return AuthResult('timeout', username)
+        except BaseException as e:
+            self._refund(username, ip)
+            if not isinstance(e, Exception):
+                raise
+
+            self._count('error')
+            return AuthResult('error', username, error=e)
+
+        if access_level is None or access_level is False:
+            self._count('denied')
+            return AuthResult('denied', username, retry_in=self._retry_in(username, ip))
+
+        self._refund(username, ip)
+
+        access_level = int(access_level)
+        if self.session_ttl > 0:
+            self._remember(digest, username, access_level)
+
+        self._count('ok')
+        return AuthResult('ok', username, access_level)
+
+    def stats(self):
+        """
+        Return the number of attempts with each outcome, including those answered from the verified credentials, and the number of credentials held.
+        """
+
+        with self._lock:
+            stats = dict(self.counts)
+            stats['verified_entries'] = len(self._verified)
+
+        return stats
+
+
+# process wide authentication services, keyed by the identity of the backend, so a backend created on every rerun shares one pool and one set of limits
+_SERVICES = {}
+_SERVICES_LOCK = threading.Lock()
+
+_CONFIG_TYPES = (str, int, float, bool, type(None))
+
+
+def _function_key(func):
+    qualname = getattr(func, '__qualname__', None)
+
+    # every lambda of a module, every closure of a factory and every bound method of a class share one name
+    if qualname is None or '<lambda>' in qualname or '<locals>' in qualname or getattr(func, '__closure__', None) or hasattr(func, '__self__'):
+        raise ValueError('The authentication function {!r} can\'t be told apart from others made the same way, '
+                         'wrap it as CallableAuthBackend(func, key=...) with a key unique to its credential store.'.format(func))
+
+    return 'function', getattr(func, '__module__', None), qualname
+
+
+def _backend_key(backend):
+    key = getattr(backend, 'key', None)
+    if key is not None:
+        return 'key', key
+
+    if isinstance(backend, CallableAuthBackend):
+        return _function_key(backend.func)
+
+    if isinstance(backend, AuthBackend):
+        # instances with the same plain configuration are the same backend, even though a new one is made on every rerun
+        config = vars(backend)
+        other = sorted(k for k, v in config.items() if k != 'key' and not isinstance(v, _CONFIG_TYPES))
+        if other:
+            raise ValueError('The authentication backend {} holds configuration that can\'t be compared ({}), '
+                             'set a key attribute unique to its credential store.'.format(type(backend).__qualname__, ', '.join(other)))
+
+        return 'backend', type(backend).__module__, type(backend).__qualname__, tuple(sorted(config.items()))
+
+    return _function_key(backend)
+
+
+def get_auth_service(backend, **options):
+    """
+    Return the process wide authentication service for the backend, creating it on the first call. The service keeps the backend it was created with, a ValueError is raised if the options differ from the ones it was created with.
+    """
+
+    key = _backend_key(backend)
+    service = _SERVICES.get(key)
+
+    if service is None:
+        with _SERVICES_LOCK:
+            service = _SERVICES.get(key)
+            if service is None:
+                service = AuthService(backend, **options)
+                _SERVICES[key] = service
+                return service
+
+    for name, value in options.items():
+        if name in service.options and service.options[name] != (tuple(value) if isinstance(value, list) else value):
+            raise ValueError('The authentication backend {} is already running with {}={}, not {}.'.format(
+                repr(key), name, repr(service.options[name]), repr(value)))
+
+    return service
@@ -0,0 +1,78 @@
+import io
+import os
+import threading
+
+
+# process wide cache of the encoded banner images, shared by every session
+_BANNER_CACHE = {}
+_BANNER_LOCK = threading.Lock()
+
+
+def _resize_image(image_bytes, max_width):
+    try:
+        from PIL import Image
+    except ImportError:
+        return image_bytes
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if img.width <= max_width:
+            return image_bytes
+
+        img_format = img.format or 'PNG'
+        height = int(round(img.height * (max_width / float(img.width))))
+        resized = img.resize((max_width, height))
+
+        buffer = io.BytesIO()
+        resized.save(buffer, format=img_format)
+
+    return buffer.getvalue()
+
+
+def load_banner(banner, max_width=None):
+    """
+    Return the banner ready to be passed to Streamlit, image files are read, optionally resized and encoded only once per process.
+
+    Parameters
+    ------------
+    banner: str or object
+        A path to an image file, anything else (urls, arrays, PIL images) is returned untouched.
+    max_width: int, None
+        If provided and Pillow is available, images wider than this will be scaled down to this width before being cached.
+
+    Returns
+    ---------
+    bytes or object: the encoded image bytes for a file path, otherwise the original banner.
+    """
+
+    if not isinstance(banner, str):
+        return banner
+
+    cache_key = (banner, max_width)
+
+    image_bytes = _BANNER_CACHE.get(cache_key)
+    if image_bytes is None:
+        with _BANNER_LOCK:
+            image_bytes = _BANNER_CACHE.get(cache_key)
+            if image_bytes is None:
+                if os.path.isfile(banner):
+                    with open(banner, 'rb') as f:
+                        image_bytes = f.read()
+
+                    if max_width is not None:
+                        image_bytes = _resize_image(image_bytes, int(max_width))
+                else:
+                    # a url or something Streamlit will resolve itself, remember that so we don't check the disk again
+                    image_bytes = banner
+
+                _BANNER_CACHE[cache_key] = image_bytes
+
+    return image_bytes
+
+
+def clear_banner_cache():
+    """
+    Remove all the cached banner images, they will be reloaded from disk on the next run.
+    """
+
+    with _BANNER_LOCK:
+        _BANNER_CACHE.clear()
@@ -0,0 +1,195 @@
+import ctypes
+import threading
+import time
+
+
+class AppTimeoutError(Exception):
+    """
+    Raised within a child app when it has run longer than the time budget it was given.
+    """
+    pass
+
+
+def is_script_control(e):
+    """
+    Check if the exception is one Streamlit uses to control script execution (stop and rerun requests), these are not app failures.
+    """
+
+    return any(c.__name__ == 'ScriptControlException' for c in type(e).__mro__)
+
+
+class Watchdog(object):
+    """
+    A context manager that interrupts the running thread with an AppTimeoutError once the time budget has been used.
+
+    The interrupt is delivered asynchronously, so it will only land once the thread is back executing Python code, a thread blocked within a long running C call (a socket read for example) will be interrupted as soon as that call returns.
+    If the interrupt can not land before the block finishes, the run is still reported as over budget through the timed_out flag.
+    """
+
+    def __init__(self, time_budget, app_name=None):
+        self.time_budget = time_budget
+        self.app_name = app_name
+        self.timed_out = False
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._done = False
+        self._fired = False
+        self._timer = None
+        self._thread_id = None
+        self._start = None
+
+    def _interrupt(self):
+        with self._lock:
+            if self._done:
+                return
+
+            self._fired = True
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._thread_id), ctypes.py_object(AppTimeoutError))
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._start = time.perf_counter()
+
+        if self.time_budget is not None:
+            self._timer = threading.Timer(self.time_budget, self._interrupt)
+            self._timer.daemon = True
+            self._timer.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self._done = True
+            if self._timer is not None:
+                self._timer.cancel()
+
+            if self._fired and exc_type is not AppTimeoutError:
+                # the interrupt never landed, make sure it doesn't go off later in unrelated code
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._thread_id), None)
+
+        self.elapsed = time.perf_counter() - self._start
+        self.timed_out = self._fired or (self.time_budget is not None and self.elapsed > self.time_budget)
+
+        if exc_type is AppTimeoutError:
+            raise AppTimeoutError('App {} exceeded its time budget of {} seconds.'.format(repr(self.app_name), self.time_budget)) from None
+
+        return False
+
+
+class CircuitBreaker(object):
+    """
+    A process wide circuit breaker for a single child app.
+
+    After max_failures consecutive failures or timeouts the breaker opens and the app is short-circuited to its fallback for cooldown seconds, after which a single trial run is allowed through, if that succeeds the breaker closes again.
+    A trial that never reports back (its session went away mid run) is given up after another cooldown, so the app can't be stuck half open.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, max_failures=3, cooldown=60):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+
+    @property
+    def state(self):
+        return self._state
+
+    def retry_in(self):
+        """
+        Return the number of seconds until the breaker will allow a trial run, zero if it is not open.
+        """
+
+        if self._state == self.OPEN:
+            return max(0, self.cooldown - (time.monotonic() - self._opened_at))
+        elif self._state == self.HALF_OPEN:
+            return max(0, self.cooldown - (time.monotonic() - self._trial_at))
+
+        return 0
+
+    def allow(self):
+        """
+        Check if the app is allowed to run.
+        """
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            now = time.monotonic()
+
+            if (self._state == self.OPEN and now - self._opened_at >= self.cooldown) or \
+                    (self._state == self.HALF_OPEN and now - self._trial_at >= self.cooldown):
+                # let a single trial run through
+                self._state = self.HALF_OPEN
+                self._trial_at = now
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+
+            if self._state == self.HALF_OPEN or self._failures >= self.max_failures:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+    def record_interrupted(self):
+        """
+        Record a run that was cut short by a redirect, rerun or stop, this tells nothing about the health of the app, so a trial run is handed to the next request.
+        """
+
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic() - self.cooldown
+                self._trial_at = None
+
+
+# process wide breakers, keyed by the scope of the HydraApp (its tenant and title) and the registered app name
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(app_name, max_failures=3, cooldown=60, scope=None):
+    """
+    Return the process wide circuit breaker for the app, creating it if needed, a breaker created with other limits is replaced.
+
+    Parameters
+    ------------
+    app_name: str
+        The registered name of the app.
+    max_failures: int, 3
+        The number of failures in a row that opens the breaker.
+    cooldown: float, 60
+        The number of seconds the breaker stays open before a trial run.
+    scope: hashable, None
+        Keeps apps of the same name apart, such as the same app served by different tenants.
+    """
+
+    key = (scope, app_name)
+    breaker = _BREAKERS.get(key)
+
+    if breaker is None or breaker.max_failures != max_failures or breaker.cooldown != cooldown:
+        with _BREAKERS_LOCK:
+            breaker = _BREAKERS.get(key)
+            if breaker is None or breaker.max_failures != max_failures or breaker.cooldown != cooldown:
+                breaker = CircuitBreaker(max_failures, cooldown)
+                _BREAKERS[key] = breaker
+
+    return breaker
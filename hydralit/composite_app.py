@@ -0,0 +1,77 @@
+import streamlit as st
+from hydralit.app_template import HydraHeadApp
+from hydralit.circuit_breaker import is_script_control
+from hydralit import worker_pool
+
+
+class CompositeApp(HydraHeadApp):
+    """
+    A child app that lays out several registered apps side by side in columns or tabs.
+
+    The prepare() method of every panel is run concurrently in a shared thread pool, then each panel is drawn into its own container on the script thread, so the time to show the view approaches that of the slowest panel rather than the sum of all of them.
+    """
+
+    def __init__(self, panels, layout='columns', spec=None, title=None):
+        """
+        Parameters
+        ------------
+        panels: list of tuple
+            The (title, app) pairs to show, in display order.
+        layout: str, 'columns'
+            Either 'columns' to show the panels side by side or 'tabs' to show a tab for each panel.
+        spec: list, None
+            The relative column widths when using the columns layout, the same as the spec used by Streamlit columns.
+        title: str, None
+            The title of the composite view.
+        """
+
+        if layout not in ['columns', 'tabs']:
+            raise ValueError("Composite layout must be either 'columns' or 'tabs', not {}.".format(repr(layout)))
+
+        self.panels = list(panels)
+        self.layout = layout
+        self.spec = spec
+        self.title = title
+        self._prepare_errors = {}
+
+    def assign_session(self, session_state, parent_app):
+        super().assign_session(session_state, parent_app)
+
+        for panel_title, panel_app in self.panels:
+            panel_app.assign_session(session_state, parent_app)
+
+    def prepare(self):
+        """
+        Run the prepare() method of every panel concurrently, any exceptions are kept and shown within the panel that raised them.
+        """
+
+        self._prepare_errors = {}
+        futures = [(panel_title, worker_pool.submit(panel_app.prepare)) for panel_title, panel_app in self.panels]
+
+        for panel_title, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self._prepare_errors[panel_title] = e
+
+    def run(self):
+        if self.layout == 'tabs':
+            containers = st.tabs([panel_title for panel_title, panel_app in self.panels])
+        else:
+            containers = st.columns(self.spec or len(self.panels))
+
+        for (panel_title, panel_app), container in zip(self.panels, containers):
+            with container:
+                if panel_title in self._prepare_errors:
+                    st.error('😭 Error triggered from app: **{}**'.format(panel_title))
+                    st.error('Details: {}'.format(self._prepare_errors[panel_title]))
+                    continue
+
+                try:
+                    panel_app.run()
+                except Exception as e:
+                    if is_script_control(e):
+                        raise
+
+                    st.error('😭 Error triggered from app: **{}**'.format(panel_title))
+                    st.error('Details: {}'.format(e))
@@ -0,0 +1,165 @@
+import collections
+import threading
+import numpy as np
+import pandas as pd
+
+
+class PagedFrame(object):
+    """
+    A DataFrame held once per process with cached sort orders and filter results, so any window of rows can be sliced out without copying or re-sorting the full frame.
+    """
+
+    def __init__(self, df, max_cached_filters=32):
+        self.df = df
+        self.max_cached_filters = max_cached_filters
+        self._lock = threading.Lock()
+        self._sort_cache = {}
+        self._filter_cache = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.df)
+
+    def sorted_positions(self, column, ascending=True):
+        """
+        Return the row positions of the frame ordered by the column, each order is computed once and reused by every session.
+        """
+
+        cache_key = (column, ascending)
+        positions = self._sort_cache.get(cache_key)
+
+        if positions is None:
+            values = self.df[column]
+            # a stable sort, so the ascending and descending orders are exact reverses for equal values
+            positions = np.asarray(values.argsort(kind='mergesort'))
+
+            if not ascending:
+                positions = positions[::-1]
+
+            with self._lock:
+                self._sort_cache[cache_key] = positions
+
+        return positions
+
+    def filtered_positions(self, column, text, sort_by=None, ascending=True):
+        """
+        Return the positions of the rows where the column contains the text, in sorted order if a sort column is given.
+        """
+
+        cache_key = (column, text, sort_by, ascending)
+
+        with self._lock:
+            positions = self._filter_cache.get(cache_key)
+            if positions is not None:
+                self._filter_cache.move_to_end(cache_key)
+                return positions
+
+        mask = self.df[column].astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+
+        if sort_by is None:
+            positions = np.flatnonzero(mask)
+        else:
+            positions = self.sorted_positions(sort_by, ascending)
+            positions = positions[mask[positions]]
+
+        with self._lock:
+            self._filter_cache[cache_key] = positions
+            while len(self._filter_cache) > self.max_cached_filters:
+                self._filter_cache.popitem(last=False)
+
+        return positions
+
+    def window(self, page=0, page_size=200, sort_by=None, ascending=True, filter_column=None, filter_text=None):
+        """
+        Return a single page of rows.
+
+        Parameters
+        ------------
+        page: int, 0
+            The zero based page number.
+        page_size: int, 200
+            The number of rows in each page.
+        sort_by: str, None
+            The column to sort by, if None the original row order is kept.
+        ascending: bool, True
+            The direction of the sort.
+        filter_column: str, None
+            The column to filter on.
+        filter_text: str, None
+            Only rows where the filter column contains this text will be included.
+
+        Returns
+        ---------
+        tuple: (DataFrame, int), the page of rows and the total number of rows matching the filter.
+        """
+
+        positions = None
+        if filter_column is not None and filter_text:
+            positions = self.filtered_positions(filter_column, filter_text, sort_by, ascending)
+        elif sort_by is not None:
+            positions = self.sorted_positions(sort_by, ascending)
+
+        total_rows = len(self.df) if positions is None else len(positions)
+
+        start = max(0, int(page)) * page_size
+        stop = min(start + page_size, total_rows)
+
+        if positions is None:
+            return self.df.iloc[start:stop], total_rows
+
+        return self.df.iloc[positions[start:stop]], total_rows
+
+
+# process wide frames, keyed by the name given by the app, so each frame is held once no matter how many sessions view it
+_FRAMES = {}
+_FRAMES_LOCK = threading.Lock()
+
+
+def get_paged_frame(key, data, refresh=False):
+    """
+    Return the process wide PagedFrame for the key, loading it if needed.
+
+    Parameters
+    ------------
+    key: str
+        The unique name of the dataset.
+    data: DataFrame or callable
+        The frame, or a function returning the frame, only used when the key has not been loaded yet or a refresh is requested. A frame passed for a key that is already held must be the same frame, or hold the same data, as the one held.
+    refresh: bool, False
+        Replace any frame already held under the key.
+
+    Raises
+    ---------
+    ValueError: a frame with other data was passed for a key that is already held, such as the results of one user under a key shared by every user.
+    """
+
+    paged_frame = _FRAMES.get(key)
+
+    if paged_frame is not None and not refresh and not callable(data) and data is not paged_frame.df:
+        # a frame built on every rerun with the same data is fine, different data would be shown the frame of whoever loaded the key first
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        if not df.equals(paged_frame.df):
+            raise ValueError('The data view {} already holds a different frame, the frame held under a key is shared by every session, '
+                             'use a key unique to the data (such as one including the user) or pass refresh=True to replace it.'.format(repr(key)))
+
+    if paged_frame is None or refresh:
+        with _FRAMES_LOCK:
+            paged_frame = _FRAMES.get(key)
+
+            if paged_frame is None or refresh:
+                df = data() if callable(data) else data
+                if not isinstance(df, pd.DataFrame):
+                    df = pd.DataFrame(df)
+
+                paged_frame = PagedFrame(df)
+                _FRAMES[key] = paged_frame
+
+    return paged_frame
+
+
+def release_paged_frame(key):
+    """
+    Stop holding the frame loaded under the key.
+    """
+
+    with _FRAMES_LOCK:
+        _FRAMES.pop(key, None)
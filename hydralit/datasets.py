@@ -0,0 +1,347 @@
+import atexit
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class Dataset(object):
+    """
+    A single loaded version of a shared dataset.
+    """
+
+    def __init__(self, name, version, data, path=None, lock_fd=None):
+        self.name = name
+        self.version = version
+        self.data = data
+        self.path = path
+        self.loaded_at = time.time()
+        self._frame = None
+        self._frame_lock = threading.Lock()
+        self._lock_fd = lock_fd
+
+    def release(self):
+        """
+        Give up this process's hold on the Arrow file, the mapped data stays readable, but the file can now be removed by whichever process finds it unused.
+        """
+
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def as_arrow(self):
+        return self.data
+
+    def as_frame(self):
+        """
+        Return the dataset as a pandas DataFrame, the frame is built once for each version and every caller gets a shallow copy of it whose column buffers are read-only.
+        A session can add, replace or drop columns of its own copy, while an edit of the values in place raises rather than changing the data for everyone else.
+        """
+
+        if self._frame is None:
+            with self._frame_lock:
+                if self._frame is None:
+                    if self.path is None:
+                        frame = self.data
+                    else:
+                        # split_blocks lets numeric columns without nulls point straight at the mapped Arrow buffers
+                        frame = self.data.to_pandas(split_blocks=True)
+
+                    self._frame = _freeze_frame(frame)
+
+        if _is_frame(self._frame):
+            return self._frame.copy(deep=False)
+
+        return self._frame.copy() if hasattr(self._frame, 'copy') else self._frame
+
+
+class DatasetRegistry(object):
+    """
+    A process wide registry of named, read-only datasets shared by every session and child app.
+
+    Each dataset is loaded once, if pyarrow is installed DataFrames are written to an Arrow IPC file and memory mapped, so the data lives in the operating system page cache and can be shared with other worker processes on the same host.
+    The file is named after the dataset and a digest of its content, so every worker process that loads the same data maps the same file. Each process holds a shared lock on the files it maps, a file is only removed by a process that can lock it exclusively, on a refresh, at exit or by the sweep of the storage folder when a registry starts. Without file locks (on Windows) the files are left for the operating system to clear from the temporary folder.
+    A refresh loads the new version in full before swapping it in with a single reference assignment, readers holding the previous version keep a valid view of it.
+    """
+
+    def __init__(self, storage_dir=None):
+        self.storage_dir = storage_dir or os.path.join(tempfile.gettempdir(), 'hydralit_datasets')
+        self._loaders = {}
+        self._options = {}
+        self._datasets = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+        self._sweep()
+        atexit.register(self._remove_files)
+
+    def _sweep(self):
+        # files left behind by processes that have exited, the ones still mapped by a live process are locked and kept
+        try:
+            file_names = os.listdir(self.storage_dir)
+        except OSError:
+            return
+
+        for file_name in file_names:
+            if file_name.endswith('.arrow'):
+                _remove_unused(os.path.join(self.storage_dir, file_name))
+
+    def _remove_files(self):
+        for dataset in list(self._datasets.values()):
+            dataset.release()
+            if dataset.path is not None:
+                _remove_unused(dataset.path)
+
+    def register(self, name, loader, use_arrow=True):
+        """
+        Register a dataset, it will be loaded the first time it is requested. Registering a name that already exists is ignored, use refresh to replace the data.
+
+        Parameters
+        ------------
+        name: str
+            The unique name of the dataset.
+        loader: callable
+            A function taking no arguments that returns the data, usually a pandas DataFrame.
+        use_arrow: bool, True
+            Hold DataFrames in a memory mapped Arrow file when pyarrow is installed, otherwise the data is kept in process memory.
+        """
+
+        with self._lock:
+            if name not in self._loaders:
+                self._loaders[name] = loader
+                self._options[name] = {'use_arrow': use_arrow}
+                self._load_locks[name] = threading.Lock()
+
+    def names(self):
+        return list(self._loaders.keys())
+
+    def version(self, name):
+        dataset = self._datasets.get(name)
+        return None if dataset is None else dataset.version
+
+    def get(self, name, as_arrow=False):
+        """
+        Return a read-only view of the current version of the dataset, loading it if needed.
+
+        Parameters
+        ------------
+        name: str
+            The name the dataset was registered with.
+        as_arrow: bool, False
+            Return the zero copy pyarrow Table rather than a pandas DataFrame, only available for datasets held in Arrow files.
+        """
+
+        dataset = self._datasets.get(name)
+        if dataset is None:
+            dataset = self._load(name)
+
+        if as_arrow:
+            if dataset.path is None:
+                raise ValueError('Dataset {} is not held in an Arrow file.'.format(repr(name)))
+            return dataset.as_arrow()
+
+        return dataset.as_frame()
+
+    def refresh(self, name, loader=None):
+        """
+        Load a new version of the dataset and swap it in, sessions already holding the previous version are not interrupted.
+
+        Parameters
+        ------------
+        name: str
+            The name the dataset was registered with.
+        loader: callable, None
+            A replacement loader, if None the registered loader is called again.
+        """
+
+        if loader is not None:
+            with self._lock:
+                self._loaders[name] = loader
+
+        return self._load(name, force=True)
+
+    def _load(self, name, force=False):
+        if name not in self._loaders:
+            raise KeyError('No dataset has been registered with the name {}.'.format(repr(name)))
+
+        with self._load_locks[name]:
+            current = self._datasets.get(name)
+            if current is not None and not force:
+                return current
+
+            version = 1 if current is None else current.version + 1
+            data = self._loaders[name]()
+            dataset = self._store(name, version, data)
+
+            # a single reference swap, so readers see either the old or the new version, never a mix
+            self._datasets[name] = dataset
+
+        if current is not None:
+            current.release()
+
+            # unchanged content maps the same file as the previous version, removing a mapped file is safe on posix, the pages stay valid until the last reader lets go
+            if current.path is not None and current.path != dataset.path:
+                _remove_unused(current.path)
+
+        return dataset
+
+    def _store(self, name, version, data):
+        if not self._options[name]['use_arrow']:
+            return Dataset(name, version, data)
+
+        try:
+            import pyarrow as pa
+            import pandas as pd
+        except ImportError:
+            return Dataset(name, version, data)
+
+        if isinstance(data, pd.DataFrame):
+            table = pa.Table.from_pandas(data, preserve_index=True)
+        elif isinstance(data, pa.Table):
+            table = data
+        else:
+            return Dataset(name, version, data)
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(name))
+        temp_path = os.path.join(self.storage_dir, '{}.{}.{}.tmp'.format(safe_name, os.getpid(), threading.get_ident()))
+
+        try:
+            _write_arrow(pa, table, temp_path)
+            path = os.path.join(self.storage_dir, '{}-{}.arrow'.format(safe_name, _file_digest(temp_path)))
+
+            while True:
+                if not os.path.exists(path):
+                    if not os.path.exists(temp_path):
+                        # the file was removed by another process after the rename, before it could be locked
+                        _write_arrow(pa, table, temp_path)
+
+                    # an atomic rename, another process mapping the same content sees either no file or the whole file
+                    os.replace(temp_path, path)
+
+                try:
+                    lock_fd = _lock_shared(path)
+                except FileNotFoundError:
+                    continue
+
+                try:
+                    mapped_table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+                except FileNotFoundError:
+                    os.close(lock_fd)
+                    continue
+                except BaseException:
+                    os.close(lock_fd)
+                    raise
+
+                break
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+        return Dataset(name, version, mapped_table, path=path, lock_fd=lock_fd)
+
+
+def _write_arrow(pa, table, path):
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _lock_shared(path):
+    # hold a shared lock on the file while this process maps it, FileNotFoundError if it was removed before the lock was taken
+    fd = os.open(path, os.O_RDONLY)
+
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+
+        if not os.path.samestat(os.fstat(fd), os.stat(path)):
+            raise FileNotFoundError(path)
+    except BaseException:
+        os.close(fd)
+        raise
+
+    return fd
+
+
+def _remove_unused(path):
+    # remove the file if no process, this one included, holds a lock on it
+    if fcntl is None:
+        return
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        # still the file at the path, not one renamed over it since it was opened
+        if os.path.samestat(os.fstat(fd), os.stat(path)):
+            os.remove(path)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _is_frame(data):
+    try:
+        import pandas as pd
+    except ImportError:
+        return False
+
+    return isinstance(data, pd.DataFrame)
+
+
+def _freeze_frame(frame):
+    # flag the buffers behind the columns read-only, the shallow copies handed out share them
+    if not _is_frame(frame):
+        return frame
+
+    import numpy as np
+
+    manager = getattr(frame, '_mgr', None)
+    for values in getattr(manager, 'arrays', ()):
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+
+    return frame
+
+
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=12)
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_dataset_registry():
+    """
+    Return the process wide dataset registry.
+    """
+
+    global _REGISTRY
+
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = DatasetRegistry()
+
+    return _REGISTRY
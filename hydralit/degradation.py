@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+
+
+def _sample_cpu():
+    # prefer psutil if it's installed, otherwise fall back to the load average where the platform has one
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None) / 100.0
+    except ImportError:
+        pass
+
+    if hasattr(os, 'getloadavg'):
+        return os.getloadavg()[0] / float(os.cpu_count() or 1)
+
+    return 0.0
+
+
+class DegradationController(object):
+    """
+    A process wide controller that watches the load on the worker and decides when optional work should be shed.
+
+    The worker is considered overloaded when any of the cpu load, the number of active sessions or the recent rerun latency goes above its high threshold, it only recovers once every value has dropped below its low threshold, this hysteresis stops the app flapping between modes.
+    """
+
+    def __init__(self, cpu_high=0.9, cpu_low=0.7, sessions_high=None, sessions_low=None, latency_high=2.0, latency_low=1.0,
+                 sample_interval=2.0, session_window=60.0, smoothing=0.2):
+        """
+        Parameters
+        ------------
+        cpu_high: float, 0.9
+            The cpu load (1.0 is all cores busy) above which the worker is overloaded, None to ignore cpu load.
+        cpu_low: float, 0.7
+            The cpu load the worker must drop below to recover.
+        sessions_high: int, None
+            The number of active sessions above which the worker is overloaded, None to ignore the session count.
+        sessions_low: int, None
+            The number of active sessions the worker must drop below to recover.
+        latency_high: float, 2.0
+            The smoothed rerun latency in seconds above which the worker is overloaded, None to ignore latency.
+        latency_low: float, 1.0
+            The smoothed rerun latency the worker must drop below to recover.
+        sample_interval: float, 2.0
+            The minimum number of seconds between load checks.
+        session_window: float, 60.0
+            A session is counted as active if it has run within this many seconds.
+        smoothing: float, 0.2
+            The weight given to each new latency sample in the moving average.
+        """
+
+        self._thresholds = {'cpu': (cpu_high, cpu_low), 'sessions': (sessions_high, sessions_low), 'latency': (latency_high, latency_low)}
+        self.sample_interval = sample_interval
+        self.session_window = session_window
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._degraded = False
+        self._last_sample = 0.0
+        self._latency = 0.0
+        self._sessions = {}
+        self._metrics = {'cpu': 0.0, 'sessions': 0, 'latency': 0.0}
+
+    def touch_session(self, session_id):
+        """
+        Record that a session has started a run.
+        """
+
+        # taken under the lock, the sampler walks the sessions while other script threads are adding to them
+        with self._lock:
+            self._sessions[session_id] = time.monotonic()
+
+    def record_latency(self, seconds):
+        """
+        Add a rerun latency sample to the moving average.
+        """
+
+        with self._lock:
+            self._latency += self.smoothing * (seconds - self._latency)
+
+    def metrics(self):
+        """
+        Return the most recently sampled load values.
+        """
+
+        return dict(self._metrics, degraded=self._degraded)
+
+    def _sample(self, now):
+        cutoff = now - self.session_window
+        for session_id in [s for s, t in self._sessions.items() if t < cutoff]:
+            self._sessions.pop(session_id, None)
+
+        self._metrics = {'cpu': _sample_cpu(), 'sessions': len(self._sessions), 'latency': self._latency}
+
+        over_high = False
+        under_low = True
+        for name, (high, low) in self._thresholds.items():
+            if high is None:
+                continue
+
+            if low is None:
+                low = high
+
+            if self._metrics[name] > high:
+                over_high = True
+            if self._metrics[name] >= low:
+                under_low = False
+
+        if not self._degraded and over_high:
+            self._degraded = True
+        elif self._degraded and under_low:
+            self._degraded = False
+
+    def is_degraded(self):
+        """
+        Check if the worker is currently overloaded and optional work should be skipped, the load is re-sampled at most once every sample_interval seconds.
+        """
+
+        now = time.monotonic()
+        if now - self._last_sample >= self.sample_interval:
+            with self._lock:
+                if now - self._last_sample >= self.sample_interval:
+                    self._last_sample = now
+                    self._sample(now)
+
+        return self._degraded
+
+
+_CONTROLLER = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_degradation_controller(**thresholds):
+    """
+    Return the process wide degradation controller, it is created with the thresholds given on the first call.
+    """
+
+    global _CONTROLLER
+
+    if _CONTROLLER is None:
+        with _CONTROLLER_LOCK:
+            if _CONTROLLER is None:
+                _CONTROLLER = DegradationController(**thresholds)
+
+    return _CONTROLLER
@@ -0,0 +1,191 @@
+import atexit
+import collections
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+
+
+class NavigationEventLog(object):
+    """
+    A per-process buffer of navigation events, written out in batches to rotating files by a background thread.
+
+    Recording an event is a single append to a bounded deque, with no lock and no I/O on the render path. When the buffer is full new events are dropped and counted rather than blocking the app or growing memory.
+    """
+
+    def __init__(self, directory, file_format='jsonl', capacity=10000, batch_size=500, flush_interval=5.0,
+                 max_file_bytes=16 * 1024 * 1024, max_files=20):
+        """
+        Parameters
+        ------------
+        directory: str
+            The folder to write the event files to.
+        file_format: str, 'jsonl'
+            Either 'jsonl' for gzip compressed JSON lines or 'parquet' for one Parquet file per batch, Parquet requires pyarrow.
+        capacity: int, 10000
+            The most events held in memory waiting to be written.
+        batch_size: int, 500
+            The number of waiting events that wakes the writer before the flush interval is up.
+        flush_interval: float, 5.0
+            The number of seconds between writes.
+        max_file_bytes: int, 16MB
+            The size at which a new JSON lines file is started.
+        max_files: int, 20
+            The number of files to keep, the oldest are removed.
+        """
+
+        if file_format not in ['jsonl', 'parquet']:
+            raise ValueError("The navigation log format must be either 'jsonl' or 'parquet', not {}.".format(repr(file_format)))
+
+        if file_format == 'parquet':
+            # fail now rather than in the writer thread
+            import pyarrow
+            import pyarrow.parquet
+
+        self.directory = directory
+        self.file_format = file_format
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+
+        self._buffer = collections.deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._current_file = None
+        self._file_count = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._thread = threading.Thread(target=self._flush_loop, name='hydralit-navlog', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, **event):
+        """
+        Add an event to the buffer, returns False if the buffer was full and the event was dropped.
+        """
+
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return False
+
+        self._buffer.append(event)
+        self.recorded += 1
+
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+        return True
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Write all the waiting events.
+        """
+
+        with self._write_lock:
+            while len(self._buffer) > 0:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._buffer.popleft())
+                except IndexError:
+                    pass
+
+                try:
+                    if self.file_format == 'parquet':
+                        self._write_parquet(batch)
+                    else:
+                        self._write_jsonl(batch)
+                    self.written += len(batch)
+                except Exception:
+                    # the events are lost, but the app and the writer carry on
+                    self.write_errors += 1
+                    self.dropped += len(batch)
+
+            self._remove_old_files()
+
+    def _new_path(self, extension):
+        self._file_count += 1
+        return os.path.join(self.directory, 'navlog-{}-{}-{:06d}.{}'.format(
+            os.getpid(), time.strftime('%Y%m%d%H%M%S'), self._file_count, extension))
+
+    def _write_jsonl(self, batch):
+        if self._current_file is None or os.path.getsize(self._current_file) >= self.max_file_bytes:
+            self._current_file = self._new_path('jsonl.gz')
+
+        lines = ''.join(json.dumps(event, default=str, separators=(',', ':')) + '\n' for event in batch)
+
+        # each batch is a separate gzip member, readers see one continuous stream
+        with gzip.open(self._current_file, 'at', encoding='utf-8') as f:
+            f.write(lines)
+
+    def _write_parquet(self, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {}
+        for event in batch:
+            for key in event:
+                columns.setdefault(key, None)
+
+        table = pa.Table.from_pydict({key: [event.get(key) for event in batch] for key in columns})
+        pq.write_table(table, self._new_path('parquet'), compression='zstd')
+
+    def _remove_old_files(self):
+        paths = sorted(glob.glob(os.path.join(self.directory, 'navlog-{}-*'.format(os.getpid()))), key=os.path.getmtime)
+
+        for path in paths[:max(0, len(paths) - self.max_files)]:
+            if path == self._current_file:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    def stats(self):
+        """
+        Return the number of events recorded, dropped, written and waiting, along with the number of failed writes.
+        """
+
+        return {'recorded': self.recorded, 'dropped': self.dropped, 'written': self.written,
+                'pending': len(self._buffer), 'write_errors': self.write_errors}
+
+
+_LOG = None
+_LOG_LOCK = threading.Lock()
+
+
+def get_event_log(directory, **options):
+    """
+    Return the process wide navigation event log, it is created with the options given on the first call.
+    """
+
+    global _LOG
+
+    if _LOG is None:
+        with _LOG_LOCK:
+            if _LOG is None:
+                _LOG = NavigationEventLog(directory, **options)
+
+    return _LOG
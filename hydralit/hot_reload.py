@@ -0,0 +1,158 @@
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+
+def app_module(app):
+    """
+    Return the name of the module the app's code comes from, for apps added with the addapp decorator this is the module of the decorated function.
+    """
+
+    run_method = vars(app).get('_run')
+    if callable(run_method) and hasattr(run_method, '__module__'):
+        return run_method.__module__
+
+    return type(app).__module__
+
+
+def rebind_app(app, module):
+    """
+    Point an app at the new definition of its code in a reloaded module, keeping the instance and everything held on it.
+
+    Returns
+    ---------
+    bool: True if the app was rebound.
+    """
+
+    run_method = vars(app).get('_run')
+    if callable(run_method) and getattr(run_method, '__module__', None) == module.__name__:
+        new_run_method = getattr(module, run_method.__name__, None)
+        if not callable(new_run_method):
+            return False
+
+        app._run = new_run_method
+        return True
+
+    new_class = getattr(module, type(app).__name__, None)
+    if not isinstance(new_class, type):
+        return False
+
+    app.__class__ = new_class
+    return True
+
+
+class ModuleWatcher(object):
+    """
+    Polls the source files of the modules the child apps come from and reloads only the modules that have changed.
+
+    Only the app modules themselves are watched, a change to a helper module the app imports is picked up when the app module is next reloaded or the process restarts.
+    """
+
+    def __init__(self, interval=1.0):
+        """
+        Parameters
+        ------------
+        interval: float, 1.0
+            The least number of seconds between checks of the files.
+        """
+
+        self.interval = interval
+        self.reload_count = 0
+        self.last_reload = {}
+        self._lock = threading.Lock()
+        self._files = {}
+        self._last_check = 0.0
+
+    def track(self, module_name):
+        """
+        Start watching the source file of the module, modules without a source file (such as the main script, which Streamlit already reruns) are ignored.
+        """
+
+        if module_name in self._files or module_name == '__main__':
+            return
+
+        module = sys.modules.get(module_name)
+        path = getattr(module, '__file__', None)
+        if path is None or not os.path.exists(path):
+            return
+
+        with self._lock:
+            self._files[module_name] = (path, os.stat(path).st_mtime_ns)
+
+    def changed(self):
+        """
+        Return the names of the watched modules whose source file has changed since it was loaded, the files are checked at most once per interval.
+        """
+
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return []
+
+        self._last_check = now
+        changed = []
+
+        for module_name, (path, mtime) in list(self._files.items()):
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    changed.append(module_name)
+            except OSError:
+                # mid-write or removed, look again next time
+                pass
+
+        return changed
+
+    def reload(self, module_name):
+        """
+        Reload the module in place, returning the module or None if another session has already reloaded this version, any error raised by the new code is passed on.
+        """
+
+        with self._lock:
+            path, mtime = self._files[module_name]
+
+            try:
+                new_mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                return None
+
+            if new_mtime == mtime:
+                return None
+
+            # mark the new version as seen first, so a broken edit is not retried on every run
+            self._files[module_name] = (path, new_mtime)
+
+            start = time.perf_counter()
+
+            try:
+                # the cached bytecode is only checked against the whole second mtime and size of the source, a quick edit can slip past it
+                os.remove(importlib.util.cache_from_source(path))
+            except (OSError, ValueError, NotImplementedError):
+                pass
+
+            module = importlib.reload(sys.modules[module_name])
+
+            self.reload_count += 1
+            self.last_reload[module_name] = time.perf_counter() - start
+
+        return module
+
+
+_WATCHER = None
+_WATCHER_LOCK = threading.Lock()
+
+
+def get_module_watcher(**options):
+    """
+    Return the process wide module watcher, it is created with the options given on the first call.
+    """
+
+    global _WATCHER
+
+    if _WATCHER is None:
+        with _WATCHER_LOCK:
+            if _WATCHER is None:
+                _WATCHER = ModuleWatcher(**options)
+
+    return _WATCHER
@@ -1,9 +1,61 @@
 from typing import Dict
+import contextlib
+import copy
+import time
 import streamlit as st
 from datetime import datetime, timedelta, timezone
 from hydralit.loading_app import LoadingApp
 import hydralit_components as hc
 from hydralit.wrapper_class import Templateapp
+from hydralit.search_index import AppSearchIndex
+from hydralit.nav_tree import NavTree
+from hydralit.banner_cache import load_banner
+from hydralit.circuit_breaker import Watchdog, get_breaker, is_script_control
+from hydralit.admission import get_admission_queue, get_rate_limiter
+from hydralit.degradation import get_degradation_controller
+from hydralit.composite_app import CompositeApp
+from hydralit.datasets import get_dataset_registry
+from hydralit.session_memory import get_session_memory_manager
+from hydralit.session_schema import SessionSchema
+from hydralit.user_cache import get_user_cache
+from hydralit.warmup import get_warmup
+from hydralit.app_template import HydraHeadApp
+from hydralit.tracing import Tracer, traced, get_trace_collector, NOOP_SPAN
+from hydralit.leak_detector import get_leak_detector
+from hydralit.event_log import get_event_log
+from hydralit.hot_reload import get_module_watcher, app_module, rebind_app
+from hydralit.render_cache import get_render_cache
+from hydralit.tenants import get_tenant_registry
+from hydralit.request_context import get_query_param, get_request_header, get_request_ip, set_query_param, slugify
+from hydralit.auth import get_auth_service
+from hydralit.worker_pool import set_worker_pool_size
+
+
+# process wide cache of the navbar menus built for each access level, keyed by the app registration signature
+_ROLE_MENU_CACHE = {}
+
+# process wide search indexes over the registered apps, used by the quick jump command palette, one for each tenant
+_SEARCH_INDEXES = {}
+
+# process wide cache of the compiled complex nav trees, keyed by the app registration signature, each holding the most recent (spec, tree) pairs
+_NAV_TREE_CACHE = {}
+_NAV_TREE_CACHE_SPECS = 8
+
+# process wide cache of the url slug lookups, keyed by the app registration signature
+_SLUG_INDEX_CACHE = {}
+
+
+def _get_search_index(tenant_id):
+    search_index = _SEARCH_INDEXES.get(tenant_id)
+    if search_index is None:
+        search_index = _SEARCH_INDEXES.setdefault(tenant_id, AppSearchIndex())
+
+    return search_index
+
+
+def _has_warmup(app):
+    # only apps that override the no-op hook are worth a pool slot
+    return getattr(type(app), 'warmup', HydraHeadApp.warmup) is not HydraHeadApp.warmup
 
 
 class HydraApp(object):
@@ -29,8 +81,30 @@ class HydraApp(object):
                  hide_streamlit_markers=False,
                  use_banner_images=None,
                  banner_spacing=None,
+                 banner_max_width=None,
                  clear_cross_app_sessions=True,
-                 session_params=None):
+                 session_params=None,
+                 use_command_palette=False,
+                 use_degradation=False,
+                 degradation_thresholds=None,
+                 use_scoped_reruns=False,
+                 session_memory_budget=None,
+                 global_memory_budget=None,
+                 spill_threshold=1024*1024,
+                 trace_exporter=None,
+                 trace_slow_threshold=1.0,
+                 trace_sample_rate=0.0,
+                 leak_detection=False,
+                 leak_sample_rate=0.1,
+                 nav_log_dir=None,
+                 nav_log_format='jsonl',
+                 hot_reload=False,
+                 hot_reload_interval=1.0,
+                 tenants=None,
+                 auth_backend=None,
+                 auth_options=None,
+                 worker_pool_size=None,
+                 trusted_proxies=0):
         """
         A class to create an Multi-app Streamlit application. This class will be the host application for multiple applications that are added after instancing.
         The secret saurce to making the different apps work together comes from the use of a global session store that is shared with any HydraHeadApp that is added to the parent HydraApp.
@@ -54,7 +128,7 @@ class HydraApp(object):
         favicon: str
             An inline favicon image to be used as the application favicon.
         allow_url_nav: bool False
-            Enable navigation using url parameters, this allows for bookmarking and using internal links for navigation
+            Enable navigation using url parameters, this allows for bookmarking and using internal links for navigation. The selected app is kept in the url as ?selected=<app-slug>, where the slug is the app title in lower case with dashes between the words, an incoming link is run in the same script run and the url is only rewritten when the selected app changes.
         use_navbar: bool, False
             Use the Hydralit Navbar component or internal Streamlit components to create the nav menu. Currently Hydralit Navbar doesn't support dropdown menus.
         navbar_theme: Dict, None
@@ -78,14 +152,82 @@ class HydraApp(object):
             A path to the image file to use as a banner above the menu or an array of paths to use multiple images spaced using the rations from the banner_spacing parameter.
         banner_spacing: Array, None
             An array to specify the alignment of the banner images, this is the same as the array spec used by Streamlit Columns, if you want centered with 20% padding either side -> banner_spacing =[20,60,20]
+        banner_max_width: int, None
+            If provided, banner image files wider than this many pixels will be scaled down once when they are first loaded, the loaded images are cached for the life of the process.
         clear_cross_app_sessions: bool, True
             A flag to indicate if the local session store values within individual apps should be cleared when moving to another app, if set to False, when loading sidebar controls, will be a difference between expected and selected.
         session_params: Dict
             A Dict of parameter name and default values that will be added to the global session store, these parameters will be available to all child applications and they can get/set values from the store during execution.
+            A value can also be a :class:`~hydralit.session_schema.SessionParam` to declare the type, default and validation rule of the parameter, e.g. {'region': SessionParam('EU', type=str, validator=lambda v: v in ['EU','US'])}.
+        use_command_palette: bool, False
+            Add a quick jump search box below the navigation menu, matching apps by title, nav section name or the keywords provided when the app was added.
+        use_degradation: bool, False
+            Shed optional work when the worker is overloaded, while overloaded the navbar animation, loader app and banners are skipped and child apps that define a run_degraded() method have that called in place of run().
+        degradation_thresholds: Dict, None
+            Override the load thresholds used to enter and leave degraded mode, see :class:`~hydralit.degradation.DegradationController` for the available keys, e.g. {'cpu_high': 0.8, 'latency_high': 3.0}.
+        use_scoped_reruns: bool, False
+            Run the selected child app within a Streamlit fragment, so widget interactions inside the app only rerun that app and the banners, access checks and navigation menu already on the page are reused. Requires a version of Streamlit with fragment support, otherwise the whole script is rerun as normal.
+        session_memory_budget: int, None
+            The approximate number of bytes each session store may hold, once exceeded the least recently used large values of the session parameters declared with SessionParam(spillable=True) are spilled to a local disk cache and read back when requested with get_session_value.
+        global_memory_budget: int, None
+            The approximate number of bytes the session stores of all users may hold together before values are spilled.
+        spill_threshold: int, 1MB
+            Only session values at least this many bytes are spilled to disk.
+        trace_exporter: str or object, None
+            Turn on tracing, each script run is recorded as one trace of OpenTelemetry compatible spans. Use 'memory' to keep the sampled traces in process (see get_traces), a file path to append them as OTLP JSON lines, or any object with an export(trace) method.
+        trace_slow_threshold: float, 1.0
+            Traces of runs taking at least this many seconds are always kept, as are the traces of runs with errors.
+        trace_sample_rate: float, 0.0
+            The fraction of the traces of the other runs to keep.
+        leak_detection: bool, False
+            A diagnostic mode that measures the memory retained after a sample of the app navigations with tracemalloc and keeps a rolling leak report for each app, add a LeakReportApp to view the reports.
+        leak_sample_rate: float, 0.1
+            The fraction of navigations measured when leak detection is on.
+        nav_log_dir: str, None
+            Record an event for every navigation between apps (the user, the apps, the time spent on the previous app and if it was a redirect), the events are buffered in memory and written to rotating files in this folder by a background thread.
+        nav_log_format: str, 'jsonl'
+            The format of the navigation log files, either 'jsonl' for gzip compressed JSON lines or 'parquet', which requires pyarrow.
+        hot_reload: bool, False
+            Watch the source files of the modules the added apps come from, when one changes only that module is reloaded and the apps from it are updated in place, all the other apps, the navigation and the session state are kept.
+        hot_reload_interval: float, 1.0
+            The least number of seconds between checks of the app source files.
+        tenants: list of TenantConfig or TenantRegistry, None
+            Serve several branded portals from one process, the tenant for each session is chosen by the host name of the request, or by the 'tenant' url parameter on hosts no tenant claims, and its title, favicon, navbar theme, banners, app subset and access levels replace the ones given here. The tenants share the process wide pools, while the render cache, menus, search index, user cache and the circuit breakers, admission queues and rate limits of the apps are kept apart for each tenant.
+        auth_backend: AuthBackend or callable, None
+            The credential store used by authenticate(), an AuthBackend or a function taking the username and password and returning the access level to grant, or None if the credentials are wrong. The checks are run in a worker pool shared by every session. A lambda or closure must be wrapped as CallableAuthBackend(func, key=...) so it can be told apart from other backends.
+        auth_options: Dict, None
+            Override the pool size, timeout, verified credential lifetime and failure limits of the authentication service, see :class:`~hydralit.auth.AuthService` for the available keys, e.g. {'max_workers': 2, 'user_failures': (3, 60)}.
+        worker_pool_size: int, None
+            The number of threads in the worker pool shared by every session that runs the prepare() of composite view panels and the load() of page sections, None to keep the default of 8.
+        trusted_proxies: int, 0
+            The number of reverse proxies in front of the app that append the client address to the X-Forwarded-For header, the failed logins from each address are throttled by authenticate(). With 0 the header, which any client can forge, is ignored and the address of the connection is used.
 
         """
 
+        # the process wide guards of the apps (circuit breakers and the like) are kept apart for each HydraApp and tenant
+        self._guard_scope = title
+
+        self._tenant = None
+        if tenants is not None:
+            self._tenant = self._resolve_tenant(get_tenant_registry(tenants))
+
+            if self._tenant is not None:
+                title = self._tenant.title or title
+                favicon = self._tenant.favicon or favicon
+                navbar_theme = self._tenant.navbar_theme or navbar_theme
+                use_banner_images = self._tenant.banners or use_banner_images
+                banner_spacing = self._tenant.banner_spacing or banner_spacing
+
+        # every process wide cache built from the registered apps is scoped to the tenant, as each tenant registers its own set
+        self._tenant_id = None if self._tenant is None else self._tenant.name
+        self._guard_scope = (self._guard_scope, self._tenant_id)
+        self._search_index = _get_search_index(self._tenant_id)
+
         self._apps = {}
+        self._app_access_levels = {}
+        self._app_options = {}
+        self._access_index = {}
+        self._registry_key = 0 if self._tenant_id is None else hash(('tenant', self._tenant_id))
         self._nav_pointers = {}
         self._navbar_pointers = {}
         self._login_app = None
@@ -94,6 +236,7 @@ class HydraApp(object):
         self._home_label = None
         self._home_id = 'Home'
         self._complex_nav = None
+        self._nav_tree = None
         self._navbar_mode = navbar_mode
         self._navbar_active_index = 0
         self._allow_url_nav = allow_url_nav
@@ -104,6 +247,7 @@ class HydraApp(object):
         self._navbar_theme = navbar_theme
         self._banners = use_banner_images
         self._banner_spacing = banner_spacing
+        self._banner_max_width = banner_max_width
         self._hide_streamlit_markers = hide_streamlit_markers
         self._loader_app = LoadingApp()
         self._user_loader = use_loader
@@ -120,8 +264,48 @@ class HydraApp(object):
         self._guest_access = 1
         self._hydralit_url_hash = 'hYDRALIT|-HaShing==seCr8t'
         self._no_access_level = 0
+        self._use_command_palette = use_command_palette
+        self._degradation = None
+        self._degraded = False
+        self._use_scoped_reruns = use_scoped_reruns
+
+        if use_degradation:
+            self._degradation = get_degradation_controller(**(degradation_thresholds or {}))
 
         self._user_session_params = session_params
+        self._session_schema = SessionSchema(session_params if isinstance(session_params, Dict) else None)
+        self._dirty_params = set()
+        self._session_memory = None
+        self._user_cache = get_user_cache()
+        self._warmup = None
+        self._trace_collector = None
+        self._tracer = None
+
+        if trace_exporter is not None:
+            self._trace_collector = get_trace_collector(trace_exporter, trace_slow_threshold, trace_sample_rate)
+
+        self._leak_detector = None
+        if leak_detection:
+            self._leak_detector = get_leak_detector(sample_rate=leak_sample_rate)
+
+        self._event_log = None
+        if nav_log_dir is not None:
+            self._event_log = get_event_log(nav_log_dir, file_format=nav_log_format)
+
+        self._render_cache = get_render_cache()
+        self._static_apps = {}
+
+        self._module_watcher = None
+        if hot_reload:
+            self._module_watcher = get_module_watcher(interval=hot_reload_interval)
+
+        self._auth = None
+        self._trusted_proxies = int(trusted_proxies or 0)
+        if auth_backend is not None:
+            self._auth = get_auth_service(auth_backend, **(auth_options or {}))
+
+        if worker_pool_size is not None:
+            set_worker_pool_size(worker_pool_size)
 
         try:
             st.set_page_config(page_title=title, page_icon=favicon,
@@ -132,6 +316,17 @@ class HydraApp(object):
         self._nav_horizontal = nav_horizontal
 
         if self._banners is not None:
+            if isinstance(self._banners, str):
+                self._banners = [self._banners]
+
+            if self._banner_spacing is not None and len(self._banner_spacing) != len(self._banners):
+                print(
+                    'WARNING: Banner spacing spec is a different length to the number of banners supplied, using even spacing for each banner.')
+                self._banner_spacing = None
+
+            if self._banner_spacing is None:
+                self._banner_spacing = [1]*len(self._banners)
+
             self._banner_container = st.container()
 
         if nav_container is None:
@@ -152,16 +347,24 @@ class HydraApp(object):
             preserve_state = 1
 
         self._session_attrs = {'previous_app': None, 'selected_app': None, 'other_nav_app': None,
-                               'preserve_state': preserve_state, 'allow_access': self._no_access_level, 'logged_in': False, 'access_hash': None}
+                               'preserve_state': preserve_state, 'allow_access': self._no_access_level, 'logged_in': False, 'access_hash': None,
+                               'cache_scope': None, 'url_app': None}
         self.session_state = st.session_state
 
-        if isinstance(self._user_session_params, Dict):
-            self._session_attrs |= self._user_session_params
+        if len(self._session_schema) > 0:
+            self._session_attrs |= self._session_schema.defaults()
 
         for key, item in self._session_attrs.items():
             if not hasattr(self.session_state, key):
                 self.session_state[key] = item
 
+        # the values at the start of this run, used to find the parameters changed during the run
+        self._params_baseline = self._session_schema.snapshot(self.session_state)
+
+        if session_memory_budget is not None or global_memory_budget is not None:
+            self._session_memory = get_session_memory_manager(session_budget=session_memory_budget, global_budget=global_memory_budget,
+                                                              spill_threshold=spill_threshold)
+
 
     # def _encode_hyauth(self):
     #     user_access_level, username = self.check_access()
@@ -188,7 +391,7 @@ class HydraApp(object):
             self._loader_app = None
             self._user_loader = False
 
-    def add_app(self, title, app, icon=None, is_login=False, is_home=False, logout_label=None, is_unsecure=False):
+    def add_app(self, title, app, icon=None, is_login=False, is_home=False, logout_label=None, is_unsecure=False, access_level=None, keywords=None, time_budget=None, max_failures=None, cooldown=60, fallback_app=None, max_concurrent=None, queue_timeout=30, rate_limit=None, is_static=False, cache_ttl=None):
         """
         Adds a new application to this HydraApp
 
@@ -206,8 +409,39 @@ class HydraApp(object):
             Is this the first 'page' that will be loaded, if a login app is provided, this is the page that will be kicked to upon successful login.
         is_unsecure: bool, False
             An app that can be run other than the login if using security, this is typically a sign-up app that can be run and then kick back to the login.
+        access_level: int, None
+            The minimum access level a user must have been granted to see and run this app, if None, any user that has been granted access can run the app. Apps the user can not access are removed from the navigation menu and are never run.
+        keywords: list of str, None
+            Additional search terms that will match this app in the quick jump command palette.
+        time_budget: float, None
+            The number of seconds the app is allowed to run for, once exceeded the app is interrupted with an AppTimeoutError. Interrupts are delivered when the app is next executing Python code, an app blocked inside a long C call is interrupted when the call returns.
+        max_failures: int, None
+            Enable a circuit breaker for this app, after this many consecutive failures or timeouts the app will not be run and the fallback will be shown instead until the cooldown has passed.
+        cooldown: float, 60
+            The number of seconds a tripped circuit breaker waits before allowing a trial run of the app.
+        fallback_app: HydraHeadApp, None
+            The app to run in place of this app while the circuit breaker is open, if None a short unavailable message is shown.
+        max_concurrent: int, None
+            The maximum number of runs of this app allowed at the same time across all users of this process, extra users wait in a first in, first out queue and are shown their position by the loader app.
+        queue_timeout: float, 30
+            The maximum number of seconds a user will wait in the queue before being told to try again later.
+        rate_limit: tuple, None
+            A (calls, seconds) pair limiting how often each user can open this app, e.g. (10, 60) for ten visits a minute. Reruns from widgets within the app are not counted.
+        is_static: bool, False
+            The app draws the same page for every user and every visit, its page is recorded on the first visit and replayed from a process wide cache on later visits without running any of the app code. Pages with widgets, media or charts can't be replayed and are run as normal.
+        cache_ttl: float, None
+            The number of seconds a recorded page is replayed for before the app is run again, setting this also marks the app as static.
         """
 
+        if self._tenant is not None and not (is_login or is_home or is_unsecure):
+            if not self._tenant.includes(title):
+                return
+
+            access_level = self._tenant.access_levels.get(title, access_level)
+
+        if self._module_watcher is not None:
+            self._module_watcher.track(app_module(app))
+
         # don't add special apps to list
         if self._use_navbar and not is_login and not is_home:
             self._navbar_pointers[title] = [title, icon]
@@ -227,64 +461,412 @@ class HydraApp(object):
         elif is_home:
             self._home_app = app
             self._home_label = [title, icon]
+            self._search_index.add(self._home_id, title=title or self._home_id, keywords=keywords)
+            self._set_app_options(self._home_id, time_budget=time_budget, max_failures=max_failures,
+                                  cooldown=cooldown, fallback_app=fallback_app, max_concurrent=max_concurrent,
+                                  queue_timeout=queue_timeout, rate_limit=rate_limit)
+            self._set_static(self._home_id, is_static, cache_ttl)
         else:
             self._apps[title] = app
+            self._search_index.add(title, keywords=keywords)
+
+            if access_level is not None:
+                self._app_access_levels[title] = int(access_level)
+            else:
+                self._app_access_levels.pop(title, None)
+
+            self._set_app_options(title, time_budget=time_budget, max_failures=max_failures,
+                                  cooldown=cooldown, fallback_app=fallback_app, max_concurrent=max_concurrent,
+                                  queue_timeout=queue_timeout, rate_limit=rate_limit)
+            self._set_static(title, is_static, cache_ttl)
+
+            # the registrations have changed, any precomputed access lookups are now stale
+            self._access_index = {}
+            self._registry_key = hash(
+                (self._registry_key, title, icon, access_level))
 
         self._nav_item_count = int(
             self._login_app is not None) + len(self._apps.keys())
         app.assign_session(self.session_state, self)
 
+        if fallback_app is not None and hasattr(fallback_app, 'assign_session'):
+            fallback_app.assign_session(self.session_state, self)
+
+    def _set_app_options(self, app_name, **options):
+        # only keep the options that have been set, so the dispatch of a plain app stays a single lookup
+        if all(options.get(k) is None for k in ['time_budget', 'max_failures', 'max_concurrent', 'rate_limit']):
+            self._app_options.pop(app_name, None)
+        else:
+            self._app_options[app_name] = options
+
+    def _resolve_tenant(self, registry):
+        # a tenant chosen by url parameter sticks to the session, so it survives navigation that rewrites the url, a host rule always wins
+        tenant_name = get_query_param(registry.param) or st.session_state.get('hydralit_tenant')
+        tenant = registry.resolve(tenant_name, get_request_header('Host'))
+
+        if tenant is not None:
+            st.session_state['hydralit_tenant'] = tenant.name
+
+        return tenant
+
+    def get_tenant(self):
+        """
+        Return the TenantConfig serving the current session, or None if tenants are not in use or no tenant matched.
+        """
+
+        return self._tenant
+
+    def _set_static(self, app_name, is_static, cache_ttl):
+        if is_static or cache_ttl is not None:
+            self._static_apps[app_name] = cache_ttl
+        else:
+            self._static_apps.pop(app_name, None)
+
+    def _get_allowed_apps(self, access_level):
+        """
+        Return the set of registered app names that can be run with the given access level, the set for each access level is computed once and reused.
+        """
+
+        allowed_apps = self._access_index.get(access_level)
+
+        if allowed_apps is None:
+            allowed_apps = frozenset(app_name for app_name in self._apps.keys()
+                                     if self._app_access_levels.get(app_name, self._no_access_level) <= access_level)
+            self._access_index[access_level] = allowed_apps
+
+        return allowed_apps
+
+    def _is_app_allowed(self, app_name):
+        if app_name == self._home_id or app_name not in self._app_access_levels:
+            return True
+
+        return app_name in self._get_allowed_apps(int(self.session_state.allow_access))
+
+    def _get_app(self, app_name):
+        if app_name == self._home_id:
+            return self._home_app
+        else:
+            return self._apps[app_name]
+
+    def _run_app(self, app, use_loader=True):
+        if hasattr(app, 'prepare'):
+            with self.trace_span('app.prepare'):
+                app.prepare()
+
+        if self._degraded:
+            # skip the loader and use the lightweight version of the app if it has one
+            if hasattr(app, 'run_degraded'):
+                with self.trace_span('app.run_degraded'):
+                    app.run_degraded()
+            else:
+                with self.trace_span('app.run'):
+                    app.run()
+
+        # can disable loader
+        elif self._user_loader and use_loader:
+            # the loader app runs the app (or draws its sections) itself, so this span also covers the loader
+            with self.trace_span('app.run', **{'hydralit.loader': True}):
+                self._loader_app.run(app)
+        else:
+            with self.trace_span('app.run'):
+                app.run()
+
+    def add_composite(self, title, app_titles, layout='columns', spec=None, icon=None, access_level=None, keywords=None):
+        """
+        Adds a composite view that shows several already added apps together on one page, in columns or tabs.
+
+        The prepare() methods of all the panels are run concurrently before the panels are drawn, so apps that do their data loading in prepare() will be shown in about the time of the slowest panel.
+
+        Parameters
+        ----------
+        title: str
+            The title of the composite view, this is the name that will appear on the menu item.
+        app_titles: list of str
+            The titles of the apps to show, as used when they were added with add_app, in display order.
+        layout: str, 'columns'
+            Either 'columns' to show the apps side by side or 'tabs' to show a tab for each app.
+        spec: list, None
+            The relative column widths when using the columns layout, the same as the spec used by Streamlit columns.
+        icon: str
+            The icon to use on the navigation button.
+        access_level: int, None
+            The minimum access level needed to see the view, if None, the highest access level required by any of the included apps is used.
+        keywords: list of str, None
+            Additional search terms that will match this view in the quick jump command palette.
+        """
+
+        if self._tenant is not None:
+            if not self._tenant.includes(title):
+                return None
+
+            app_titles = [app_title for app_title in app_titles if self._tenant.includes(app_title)]
+
+        missing_apps = [app_title for app_title in app_titles if app_title not in self._apps]
+        if len(missing_apps) > 0:
+            raise ValueError('Composite view {} references apps that have not been added: {}'.format(
+                repr(title), ', '.join(repr(a) for a in missing_apps)))
+
+        if access_level is None:
+            panel_levels = [self._app_access_levels[app_title] for app_title in app_titles if app_title in self._app_access_levels]
+            if len(panel_levels) > 0:
+                access_level = max(panel_levels)
+
+        composite_app = CompositeApp([(app_title, self._apps[app_title]) for app_title in app_titles],
+                                     layout=layout, spec=spec, title=title)
+
+        self.add_app(title, composite_app, icon=icon, access_level=access_level, keywords=keywords)
+
+        return composite_app
+
+    @traced('dispatch')
+    def _dispatch(self, app_name):
+        # a visit is only charged to the rate limit once, widget reruns of the app it was charged for are free, moving to another app ends the visit
+        if self.session_state.get('rate_charged_app') != app_name:
+            self.session_state.rate_charged_app = None
+
+        fragment = None
+        if self._use_scoped_reruns:
+            fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+        if fragment is None:
+            self._dispatch_app(app_name)
+            return
+
+        first_run = [True]
+
+        @fragment
+        def hydralit_scoped_app():
+            # the loader is only wanted when navigating to the app, not when a widget inside the app reruns the fragment
+            use_loader = first_run[0]
+            first_run[0] = False
+
+            if use_loader:
+                self._dispatch_app(app_name)
+            else:
+                # fragment reruns don't pass through _run_selected, so errors must be caught here
+                try:
+                    self._dispatch_app(app_name, use_loader=False)
+                except Exception as e:
+                    self._show_app_error(e)
+
+        hydralit_scoped_app()
+
+    def _dispatch_app(self, app_name, use_loader=True):
+        app = self._get_app(app_name)
+        app_options = self._app_options.get(app_name)
+
+        measure = contextlib.nullcontext()
+        if self._leak_detector is not None:
+            measure = self._leak_detector.measure(app_name)
+
+        with measure:
+            if app_name in self._static_apps:
+                # static pages are drawn in an instant once recorded, so they skip the loader
+                self._render_cache.render((self._tenant_id, app_name), lambda: self._run_dispatched(app_name, app, app_options, False),
+                                          ttl=self._static_apps[app_name])
+            else:
+                self._run_dispatched(app_name, app, app_options, use_loader)
+
+    def _run_dispatched(self, app_name, app, app_options, use_loader):
+        if app_options is None:
+            self._run_app(app, use_loader)
+        else:
+            self._run_guarded(app_name, app, app_options, use_loader)
+
+    def _run_guarded(self, app_name, app, app_options, use_loader=True):
+        if app_options['rate_limit'] is not None and self.session_state.get('rate_charged_app') != app_name:
+            calls, period = app_options['rate_limit']
+            limiter = get_rate_limiter(app_name, calls, period, scope=self._guard_scope)
+            user_key = self.session_state.get('current_user') or self._get_session_id()
+
+            if not limiter.allow(user_key):
+                # the visit stays uncharged, so every rerun until the limit frees up is turned away too
+                st.warning('🚦 You are running **{}** too often, please try again in {:.0f} seconds.'.format(
+                    app_name, limiter.retry_in(user_key)))
+                return
+
+            self.session_state.rate_charged_app = app_name
+
+        breaker = None
+        if app_options['max_failures'] is not None:
+            breaker = get_breaker(app_name, app_options['max_failures'], app_options['cooldown'], scope=self._guard_scope)
+
+            if not breaker.allow():
+                self._run_fallback(app_name, app_options, breaker)
+                return
+
+        admission_queue = None
+        if app_options['max_concurrent'] is not None:
+            admission_queue = get_admission_queue(app_name, app_options['max_concurrent'], scope=self._guard_scope)
+
+            queue_status = st.empty()
+
+            def on_wait(position):
+                if hasattr(self._loader_app, 'queue_status'):
+                    self._loader_app.queue_status(app, position, queue_status)
+                else:
+                    queue_status.info('⏳ {} is busy, you are number {} in the queue.'.format(app_name, position))
+
+            if not admission_queue.acquire(timeout=app_options['queue_timeout'], on_wait=on_wait):
+                if breaker is not None:
+                    breaker.record_interrupted()
+
+                queue_status.empty()
+                st.warning('⏳ **{}** is very busy right now, please try again shortly.'.format(app_name))
+                return
+
+        # the slot is held from here, so everything up to the release must be within the try, a rerun can be raised by any Streamlit call
+        try:
+            if admission_queue is not None:
+                queue_status.empty()
+
+            with Watchdog(app_options['time_budget'], app_name) as watchdog:
+                self._run_app(app, use_loader)
+        except BaseException as e:
+            # Streamlit's stop and rerun requests are BaseExceptions, they must still settle a trial run
+            if breaker is not None:
+                if is_script_control(e):
+                    breaker.record_interrupted()
+                else:
+                    breaker.record_failure()
+            raise
+        finally:
+            if admission_queue is not None:
+                admission_queue.release()
+
+        if breaker is not None:
+            if watchdog.timed_out:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+    def _get_session_id(self):
+        try:
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+        except ImportError:
+            from streamlit.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+
+        return ctx.session_id
+
+    def _run_fallback(self, app_name, app_options, breaker):
+        if app_options['fallback_app'] is not None:
+            app_options['fallback_app'].run()
+        else:
+            st.warning('⏳ **{}** is temporarily unavailable, please try again in {:.0f} seconds.'.format(
+                app_name, breaker.retry_in()))
+
     def _run_selected(self):
+        run_start = time.perf_counter()
+
         try:
-            if self.session_state.selected_app is None:
-                self.session_state.other_nav_app = None
+            if self.session_state.selected_app is None and self.session_state.other_nav_app is None:
                 self.session_state.previous_app = None
                 self.session_state.selected_app = self._home_id
 
-                # can disable loader
-                if self._user_loader:
-                    self._loader_app.run(self._home_app)
-                else:
-                    self._home_app.run()
-
-                # st.experimental_set_query_params(selected=self._home_app)
+                self._sync_url(self._home_id)
+                self._log_navigation(self._home_id)
+                self._dispatch(self._home_id)
             else:
 
+                nav_kind = 'nav'
                 if self.session_state.other_nav_app is not None:
+                    nav_kind = 'redirect'
                     self.session_state.previous_app = self.session_state.selected_app
                     self.session_state.selected_app = self.session_state.other_nav_app
                     self.session_state.other_nav_app = None
 
-                    if self.session_state.selected_app == self._home_id:
-                        if self._user_loader:
-                            self._loader_app.run(self._home_app)
-                        else:
-                            self._home_app.run()
-                    else:
-                        if self._user_loader:
-                            self._loader_app.run(
-                                self._apps[self.session_state.selected_app])
-                        else:
-                            self._apps[self.session_state.selected_app].run()
-                else:
-                    if self.session_state.selected_app == self._home_id:
-                        if self._user_loader:
-                            self._loader_app.run(self._home_app)
-                        else:
-                            self._home_app.run()
-                    else:
-                        if self._user_loader:
-                            self._loader_app.run(
-                                self._apps[self.session_state.selected_app])
-                        else:
-                            self._apps[self.session_state.selected_app].run()
-                # st.experimental_set_query_params(selected=self.session_state.selected_app)
+                # reject the request before any of the app code is run
+                if not self._is_app_allowed(self.session_state.selected_app):
+                    st.error(
+                        '🔒 Access denied to app: **{}**'.format(self.session_state.selected_app))
+                    return
+
+                self._sync_url(self.session_state.selected_app)
+                self._log_navigation(self.session_state.selected_app, nav_kind)
+                self._dispatch(self.session_state.selected_app)
 
         except Exception as e:
-            st.error(
-                '😭 Error triggered from app: **{}**'.format(self.session_state.selected_app))
-            st.error('Details: {}'.format(e))
+            self._show_app_error(e)
+
+        finally:
+            if self._degradation is not None:
+                self._degradation.record_latency(time.perf_counter() - run_start)
+
+    def _reload_changed_apps(self):
+        for module_name in self._module_watcher.changed():
+            try:
+                module = self._module_watcher.reload(module_name)
+            except Exception as e:
+                st.error('😭 Error reloading module: **{}**'.format(module_name))
+                st.error('Details: {}'.format(e))
+                continue
+
+            if module is None:
+                continue
+
+            registered_apps = list(self._apps.items()) + [(self._home_id, self._home_app), (None, self._login_app), (None, self._unsecure_app)]
+            for app_name, app in registered_apps:
+                if app is not None and app_module(app) == module_name:
+                    rebind_app(app, module)
+
+                    # a recorded page was drawn by the old code, for every tenant
+                    if app_name is not None:
+                        self._render_cache.invalidate_app(app_name)
+
+    def _log_navigation(self, app_name, kind='nav'):
+        if self._event_log is None:
+            return
+
+        last_app = self.session_state.get('nav_log_app')
+        if kind == 'nav' and app_name == last_app:
+            # a rerun within the same app, not a navigation
+            return
+
+        now = time.time()
+        last_time = self.session_state.get('nav_log_time')
+
+        self._event_log.record(ts=now, session=self._get_session_id(), user=self.session_state.get('current_user'),
+                               access_level=int(self.session_state.allow_access), from_app=last_app, to_app=app_name,
+                               dwell=None if last_time is None else round(now - last_time, 3), kind=kind)
+
+        # leaving for an external url doesn't change the app the user is on
+        if kind != 'external':
+            self.session_state.nav_log_app = app_name
+            self.session_state.nav_log_time = now
+
+    def get_render_cache_stats(self):
+        """
+        Return the metrics of the process wide render cache used by static apps.
+        Returns
+        ---------
+        dict: the number of pages held ('entries'), their size in bytes ('bytes'), the number of visits replayed from the cache ('hits') and run to draw the page ('misses'), the fraction of visits replayed ('hit_rate') and the number of static apps found to have pages that can't be replayed ('uncacheable').
+        """
+
+        return self._render_cache.stats()
+
+    def get_nav_log_stats(self):
+        """
+        Return the counters of the navigation event log.
+        Returns
+        ---------
+        dict: the number of events recorded ('recorded'), dropped because the buffer was full or a write failed ('dropped'), written to file ('written') and waiting to be written ('pending'), along with the number of failed writes ('write_errors'), or None if navigation logging is off.
+        """
+
+        if self._event_log is None:
+            return None
+
+        return self._event_log.stats()
+
+    def _show_app_error(self, e):
+        st.error(
+            '😭 Error triggered from app: **{}**'.format(self.session_state.selected_app))
+        st.error('Details: {}'.format(e))
 
+    @traced('clear_session')
     def _clear_session_values(self):
         for key in st.session_state:
             del st.session_state[key]
@@ -310,9 +892,13 @@ class HydraApp(object):
             The value to use to block access, all other values will have some level of access
         """
 
-        if no_access_level is not None:
+        if no_access_level is not None and int(no_access_level) != self._no_access_level:
             self._no_access_level = int(no_access_level)
 
+            # the allowed apps and role menus were worked out against the old level
+            self._access_index = {}
+            self._registry_key = hash((self._registry_key, 'no_access_level', self._no_access_level))
+
     def set_access(self, allow_access=0, access_user='', cache_access=False):
         """
         Set the access permission and the assigned username for that access during the current session.
@@ -332,6 +918,50 @@ class HydraApp(object):
         # Also, who are we letting in..
         self.session_state.current_user = access_user
 
+    def authenticate(self, username, password):
+        """
+        Check the credentials with the authentication backend, on success the access is set for the session and the login callback is run, the caller then only has to redirect to the home app.
+
+        The check is run in the shared worker pool, repeated failures for a username or from an ip address are throttled and credentials verified in the last few minutes are accepted without checking them again.
+
+        Parameters
+        -----------
+        username: str
+            The username entered.
+        password: str
+            The password entered.
+
+        Returns
+        ---------
+        AuthResult: the outcome, with a status of 'ok', 'denied', 'throttled', 'busy', 'timeout' or 'error', and the access level granted or the seconds to wait before trying again.
+        """
+
+        if self._auth is None:
+            raise ValueError('No authentication backend has been set, pass auth_backend to HydraApp.')
+
+        with self.trace_span('authenticate') as span:
+            result = self._auth.authenticate(username, password, ip=get_request_ip(self._trusted_proxies))
+            span.set_attribute('hydralit.auth_status', result.status)
+
+        if result.ok and result.access_level > self._no_access_level:
+            self.set_access(result.access_level, username)
+
+            if callable(self._login_callback):
+                self.session_state.logged_in = True
+                self._login_callback()
+
+        return result
+
+    def get_auth_stats(self):
+        """
+        Return the number of login attempts with each outcome since the process started, or None if no authentication backend has been set.
+        """
+
+        if self._auth is None:
+            return None
+
+        return self._auth.stats()
+
     def check_access(self):
         """
         Check the access permission and the assigned user for the running session.
@@ -346,6 +976,152 @@ class HydraApp(object):
 
         return int(self.session_state.allow_access), username
 
+    def warmup(self, parallelism=4, timeout=60, wait=True):
+        """
+        Run the warmup() hooks of all the added apps, once per process, so the first user after a deploy doesn't pay for the lazy initialization of every app. Call this after all the apps have been added and before run().
+
+        Parameters
+        -----------
+        parallelism: int, 4
+            The number of apps to warm up at the same time.
+        timeout: float, 60
+            The number of seconds each app is allowed for its warm-up, None for no limit, an app that runs over is reported as timed out and does not hold back the others.
+        wait: bool, True
+            Block until the warm-up has finished, if False the warm-up continues in the background and is_ready() can be used to check on it.
+        Returns
+        ---------
+        bool: True if the warm-up has finished.
+        """
+
+        apps = [(app_name, app) for app_name, app in self._apps.items() if _has_warmup(app)]
+        if self._home_app is not None and _has_warmup(self._home_app):
+            apps.insert(0, (self._home_id, self._home_app))
+
+        self._warmup = get_warmup((self._registry_key, self._home_id), apps, parallelism=parallelism, timeout=timeout)
+
+        if wait:
+            self._warmup.wait()
+
+        return self._warmup.is_ready()
+
+    def is_ready(self):
+        """
+        Check if the warm-up started with warmup() has finished, always True if no warm-up was requested.
+        """
+
+        return self._warmup is None or self._warmup.is_ready()
+
+    def get_warmup_report(self):
+        """
+        Return the results of the warm-up.
+        Returns
+        ---------
+        dict: the status ('pending', 'running', 'ok', 'failed' or 'timeout'), duration in seconds ('duration') and any error message ('error') for each app, keyed by the app name, or None if no warm-up was requested.
+        """
+
+        if self._warmup is None:
+            return None
+
+        return self._warmup.report()
+
+    def trace_span(self, name, **attributes):
+        """
+        Return a context manager that records a span within the trace of the current run, nested within any span already open. When tracing is off a span that does nothing is returned, so the call can be left in place.
+
+        Parameters
+        -----------
+        name: str
+            The name of the operation.
+        attributes:
+            Attributes to record on the span.
+        Returns
+        ---------
+        context manager: the span, as the target of the with statement, spans have set_attribute(key, value) and add_event(name, **attributes) methods.
+        """
+
+        if self._tracer is None:
+            return NOOP_SPAN
+
+        return self._tracer.span(name, **attributes)
+
+    def get_leak_report(self, app_name=None):
+        """
+        Return the memory leak reports gathered when leak detection is on, keyed by app name, or just the report for the app if one is given.
+        Returns
+        ---------
+        dict: the number of navigations sampled ('samples'), the total and mean bytes retained per navigation ('total_growth', 'mean_growth'), the bytes retained by each recent navigation ('recent_growth') and the allocation sites that have retained the most memory ('top_sites'), or None if leak detection is off.
+        """
+
+        if self._leak_detector is None:
+            return None
+
+        return self._leak_detector.report(app_name)
+
+    def get_traces(self):
+        """
+        Return the traces kept in process when using trace_exporter='memory', oldest first, each in the OpenTelemetry (OTLP) JSON encoding, or None if traces are not kept in process.
+        """
+
+        if self._trace_collector is None or not hasattr(self._trace_collector.exporter, 'traces'):
+            return None
+
+        return self._trace_collector.exporter.traces()
+
+    def add_dataset(self, name, loader, use_arrow=True):
+        """
+        Register a named, read-only dataset that is loaded once per process and shared by every session and child app, child apps access it with self.parent_app.get_dataset(name).
+
+        Parameters
+        -----------
+        name: str
+            The unique name of the dataset.
+        loader: callable
+            A function taking no arguments that returns the data, usually a pandas DataFrame, it is only called the first time the dataset is requested or when it is refreshed.
+        use_arrow: bool, True
+            Hold DataFrames in a memory mapped Arrow file when pyarrow is installed, so the data lives in the operating system page cache and the views handed out are zero copy.
+        """
+
+        get_dataset_registry().register(name, loader, use_arrow=use_arrow)
+
+    def get_dataset(self, name, as_arrow=False):
+        """
+        Return a read-only view of the current version of a shared dataset.
+        Parameters
+        -----------
+        name: str
+            The name the dataset was added with.
+        as_arrow: bool, False
+            Return the zero copy pyarrow Table rather than a pandas DataFrame.
+        Returns
+        ---------
+        DataFrame or pyarrow.Table
+        """
+
+        return get_dataset_registry().get(name, as_arrow=as_arrow)
+
+    def refresh_dataset(self, name, loader=None):
+        """
+        Load a new version of a shared dataset and swap it in atomically, sessions already holding the previous version keep using it until their next request.
+        Parameters
+        -----------
+        name: str
+            The name the dataset was added with.
+        loader: callable, None
+            A replacement loader, if None the loader the dataset was added with is called again.
+        """
+
+        get_dataset_registry().refresh(name, loader=loader)
+
+    def is_degraded(self):
+        """
+        Check if the worker is overloaded and this run is shedding optional work, child apps can use this to skip expensive extras.
+        Returns
+        ---------
+        bool
+        """
+
+        return self._degraded
+
     def get_nav_transition(self):
         """
         Check the previous and current app names the user has navigated between
@@ -356,6 +1132,42 @@ class HydraApp(object):
 
         return str(self.session_state.previous_app), str(self.session_state.selected_app)
 
+    def get_session_value(self, key, default=None):
+        """
+        Return a value from the session store, if the value was spilled to disk to keep within the memory budget, it is read back and restored to the store. Spillable session parameters must be read this way.
+        Parameters
+        -----------
+        key: str
+            The session store key.
+        default: object, None
+            The value to return if the key is not in the session store.
+        """
+
+        if key not in self.session_state:
+            return default
+
+        if self._session_memory is None:
+            return self.session_state[key]
+
+        try:
+            return self._session_memory.load(self._get_session_id(), self.session_state, key)
+        except KeyError:
+            # spilled and since cleaned up while the session was idle
+            return default
+
+    def get_session_memory_usage(self):
+        """
+        Return the approximate memory held by the session stores, only available when a session or global memory budget has been set.
+        Returns
+        ---------
+        dict: the total bytes held by all sessions ('global'), the bytes held by each session ('sessions'), the bytes held by each key of this session ('keys'), the bytes currently spilled to disk ('spilled_bytes') and the number of values spilled so far ('spill_count'), or None if not tracking memory.
+        """
+
+        if self._session_memory is None:
+            return None
+
+        return self._session_memory.usage(self._get_session_id())
+
     def get_user_session_params(self):
         """
         Return a dictionary of the keys and current values of the user defined session parameters.
@@ -363,16 +1175,100 @@ class HydraApp(object):
         ---------
         dict
         """
-        user_session_params = {}
 
-        if self._user_session_params is not None:
-            for k in self._user_session_params.keys():
-                if hasattr(self.session_state, k):
-                    user_session_params[k] = getattr(self.session_state, k)
+        return self._session_schema.snapshot(self.session_state)
+
+    def update_session_params(self, values=None, **kwargs):
+        """
+        Set several user defined session parameters at once, all the values are validated against the parameter declarations before any are written.
+        Parameters
+        -----------
+        values: Dict, None
+            The parameter names and new values.
+        kwargs:
+            The parameter names and new values, as keyword arguments.
+        Raises
+        --------
+        KeyError, TypeError, ValueError
+            If a name is not a declared session parameter or a value is not allowed, in which case nothing is written.
+        """
+
+        updates = dict(values or {}, **kwargs)
+        self._session_schema.validate(updates)
+
+        for name, value in updates.items():
+            self.session_state[name] = value
+
+        self._dirty_params.update(updates.keys())
+
+    def get_dirty_session_params(self):
+        """
+        Return the user defined session parameters that have been changed during the current run, so caches and persistence layers only need to act on what changed.
+        Values changed in place (appending to a list for example) are only detected when set through update_session_params.
+        Returns
+        ---------
+        dict: the names and current values of the changed parameters.
+        """
+
+        dirty_names = self._dirty_params | self._session_schema.changed(self._params_baseline, self.session_state)
+
+        return {name: self.session_state[name] for name in dirty_names if name in self.session_state}
+
+    def _cache_user(self, user=None):
+        # anonymous sessions get their own scope, so nothing is shared between them
+        if user is None:
+            user = self.session_state.get('current_user') or 'session:{}'.format(self._get_session_id())
+
+        # the same username in two tenants is two different users
+        if self._tenant_id is not None:
+            return self._tenant_id, user
 
-        return user_session_params
+        return user
+
+    def _check_cache_scope(self):
+        # a login, logout or user switch changes the (user, access level) pair, whatever set it, so drop the previous user's results
+        scope = (self._cache_user(), int(self.session_state.allow_access))
+        previous_scope = self.session_state.cache_scope
+
+        if previous_scope != scope:
+            if previous_scope is not None:
+                self._user_cache.invalidate_user(previous_scope[0])
+            self.session_state.cache_scope = scope
+
+    def cached_for_user(self, key, func, *args, app_name=None, ttl=None, **kwargs):
+        """
+        Return a result cached for the current user, access level and app, calling func(*args, **kwargs) to compute it if needed.
+
+        The cached results of a user are dropped when they log in or out, or when the session switches to a different user or access level, so results can be cached without any risk of serving them to another user.
+        Parameters
+        -----------
+        key: hashable
+            The name of the result within the app.
+        func: callable
+            The function that computes the result.
+        app_name: str, None
+            The app the result belongs to, defaults to the currently selected app.
+        ttl: float, None
+            The number of seconds the result is valid for, None for no expiry.
+        """
+
+        if app_name is None:
+            app_name = self.session_state.selected_app
+
+        scope = (self._cache_user(), int(self.session_state.allow_access), app_name)
+
+        return self._user_cache.get_or_compute(scope, key, func, *args, ttl=ttl, **kwargs)
+
+    def clear_user_cache(self, user=None):
+        """
+        Drop every result cached for the user, defaults to the current user.
+        """
+
+        self._user_cache.invalidate_user(self._cache_user(user))
 
     def _do_logout(self):
+        self._user_cache.invalidate_user(self._cache_user())
+        self.session_state.cache_scope = None
         self.session_state.allow_access = self._no_access_level
         self._logged_in = False
         # self._delete_cookie_cache()
@@ -381,6 +1277,7 @@ class HydraApp(object):
 
         st.experimental_rerun()
 
+    @traced('run_navbar')
     def _run_navbar(self, menu_data):
 
         if hasattr(hc, '__version__'):
@@ -397,10 +1294,11 @@ class HydraApp(object):
                     home_nav = {
                         'id': self._home_id, 'label': self._home_label[0], 'icon': self._home_label[1], 'ttip': 'Home'}
 
-                self.session_state.selected_app = hc.nav_bar(menu_definition=menu_data, key="mainHydralitMenuComplex", home_name=home_nav, override_theme=self._navbar_theme,
-                                                             login_name=login_nav, use_animation=self._navbar_animation, hide_streamlit_markers=self._hide_streamlit_markers)
+                self.session_state.selected_app = hc.nav_bar(menu_definition=menu_data, first_select=self._navbar_first_select(menu_data), key="mainHydralitMenuComplex",
+                                                             home_name=home_nav, override_theme=self._navbar_theme, login_name=login_nav, use_animation=self._navbar_animation,
+                                                             hide_streamlit_markers=self._hide_streamlit_markers)
         else:
-            self.session_state.selected_app = hc.nav_bar(menu_definition=menu_data, key="mainHydralitMenuComplex",
+            self.session_state.selected_app = hc.nav_bar(menu_definition=menu_data, first_select=self._navbar_first_select(menu_data), key="mainHydralitMenuComplex",
                                                          home_name=self._home_app, override_theme=self._navbar_theme, login_name=self._logout_label)
 
         # if nav_selected is not None:
@@ -410,13 +1308,31 @@ class HydraApp(object):
         if self.cross_session_clear and self.session_state.preserve_state:
             self._clear_session_values()
 
+    def _get_role_menu(self):
+        """
+        Return the navbar menu definition for the access level of the current user, each menu is built once per access level and shared across all sessions.
+        """
+
+        access_level = int(self.session_state.allow_access)
+        cache_key = (self._registry_key, access_level)
+
+        menu_data = _ROLE_MENU_CACHE.get(cache_key)
+        if menu_data is None:
+            allowed_apps = self._get_allowed_apps(access_level)
+            menu_data = [{'label': self._navbar_pointers[app_name][0], 'id':app_name,
+                          'icon': self._navbar_pointers[app_name][1]} for app_name in self._apps.keys() if app_name in allowed_apps]
+            _ROLE_MENU_CACHE[cache_key] = menu_data
+
+        return menu_data
+
+    @traced('build_nav_menu')
     def _build_nav_menu(self):
 
         if self._complex_nav is None:
             number_of_sections = self._nav_item_count
         else:
             number_of_sections = int(
-                self._login_app is not None) + len(self._complex_nav.keys())
+                self._login_app is not None) + len(self._nav_tree.sections)
 
         if self._nav_horizontal:
             if hasattr(self._nav_container, 'columns'):
@@ -435,8 +1351,7 @@ class HydraApp(object):
         # actually build the menu
         if self._complex_nav is None:
             if self._use_navbar:
-                menu_data = [{'label': self._navbar_pointers[app_name][0], 'id':app_name,
-                              'icon': self._navbar_pointers[app_name][1]} for app_name in self._apps.keys()]
+                menu_data = self._get_role_menu()
 
                 # Add logout button and kick to login action
                 if self._login_app is not None:
@@ -453,7 +1368,8 @@ class HydraApp(object):
                     with self._nav_container:
                         self._run_navbar(menu_data)
             else:
-                for i, app_name in enumerate(self._apps.keys()):
+                allowed_apps = self._get_allowed_apps(int(self.session_state.allow_access))
+                for i, app_name in enumerate(app_name for app_name in self._apps.keys() if app_name in allowed_apps):
                     if self._nav_horizontal:
                         nav_section_root = nav_slots[i]
                     else:
@@ -478,29 +1394,11 @@ class HydraApp(object):
                         if nav_slots.button(label=self._logout_label):
                             self._do_logout()
         else:
+            access_level = int(self.session_state.allow_access)
+            allowed_apps = self._get_allowed_apps(access_level)
+
             if self._use_navbar:
-                menu_data = []
-                for i, nav_section_name in enumerate(self._complex_nav.keys()):
-                    menu_item = None
-                    if nav_section_name not in [self._home_id, self._logout_id]:
-                        if len(self._complex_nav[nav_section_name]) == 1:
-                            # if (self._complex_nav[nav_section_name][0] != self._home_app and self._complex_nav[nav_section_name][0] != self._logout_label):
-                            menu_item = {'label': self._navbar_pointers[self._complex_nav[nav_section_name][0]][0], 'id': self._complex_nav[
-                                nav_section_name][0], 'icon': self._navbar_pointers[self._complex_nav[nav_section_name][0]][1]}
-                        else:
-                            submenu_items = []
-                            for nav_item in self._complex_nav[nav_section_name]:
-                                # if (nav_item != self._home_app and nav_item != self._logout_label):
-                                menu_item = {
-                                    'label': self._navbar_pointers[nav_item][0], 'id': nav_item, 'icon': self._navbar_pointers[nav_item][1]}
-                                submenu_items.append(menu_item)
-
-                            if len(submenu_items) > 0:
-                                menu_item = {
-                                    'label': nav_section_name, 'id': nav_section_name, 'submenu': submenu_items}
-
-                        if menu_item is not None:
-                            menu_data.append(menu_item)
+                menu_data = self._nav_tree.navbar_menu(access_level, self._navbar_pointers, allowed_apps)
 
                 # Add logout button and kick to login action
                 if self._login_app is not None:
@@ -520,23 +1418,25 @@ class HydraApp(object):
 
             else:
 
-                for i, nav_section_name in enumerate(self._complex_nav.keys()):
-                    if nav_section_name not in [self._home_id, self._logout_id]:
-                        if self._nav_horizontal:
-                            nav_section_root = nav_slots[i]
-                        else:
-                            nav_section_root = nav_slots
+                for i, (nav_section_name, nav_entries) in enumerate(self._nav_tree.button_layout(access_level, allowed_apps)):
+                    if self._nav_horizontal:
+                        nav_section_root = nav_slots[i]
+                    else:
+                        nav_section_root = nav_slots
 
-                        if len(self._complex_nav[nav_section_name]) == 1:
-                            nav_section = nav_section_root.container()
-                        else:
-                            nav_section = nav_section_root.expander(
-                                label=nav_section_name, expanded=False)
+                    if len(nav_entries) == 1:
+                        nav_section = nav_section_root.container()
+                    else:
+                        nav_section = nav_section_root.expander(
+                            label=nav_section_name, expanded=False)
 
-                        for nav_item in self._complex_nav[nav_section_name]:
-                            if nav_section.button(label=self._nav_pointers[nav_item]):
-                                self.session_state.previous_app = self.session_state.selected_app
-                                self.session_state.selected_app = nav_item
+                    # expanders can't be nested, so deeper sections are shown as indented captions within the top level section
+                    for depth, nav_label, nav_item in nav_entries:
+                        if nav_item is None:
+                            nav_section.caption('{}{}'.format('\u2003' * (depth - 1), nav_label))
+                        elif nav_section.button(label=self._nav_pointers.get(nav_item, nav_label)):
+                            self.session_state.previous_app = self.session_state.selected_app
+                            self.session_state.selected_app = nav_item
 
                 if self.cross_session_clear and self.session_state.previous_app != self.session_state.selected_app and not self.session_state.preserve_state:
                     self._clear_session_values()
@@ -553,15 +1453,138 @@ class HydraApp(object):
                         if nav_slots.button(label=self._logout_label[0]):
                             self._do_logout()
 
+    def _compile_nav_tree(self, complex_nav):
+        """
+        Return the compiled navigation tree for the nav specification, the tree is validated and built once per process for each set of registered apps and specification, so an edited script or a specification that differs by role gets its own tree.
+        """
+
+        entries = _NAV_TREE_CACHE.setdefault(self._registry_key, [])
+        for nav_spec, nav_tree in list(entries):
+            # a plain comparison of the specifications, far cheaper than compiling the tree
+            if nav_spec == complex_nav:
+                return nav_tree
+
+        nav_spec = complex_nav
+        if self._tenant is not None:
+            complex_nav = self._tenant.prune_nav(complex_nav)
+
+        nav_tree = NavTree(complex_nav, self._apps, skip_sections=[self._home_id, self._logout_id])
+
+        for app_id in nav_tree.app_ids():
+            self._search_index.add(app_id, section=nav_tree.section_label(app_id))
+
+        # a copy, so a specification changed in place after this call is still seen as changed
+        entries.insert(0, (copy.deepcopy(nav_spec), nav_tree))
+        del entries[_NAV_TREE_CACHE_SPECS:]
+
+        return nav_tree
+
+    def get_nav_breadcrumb(self):
+        """
+        Return the nav section labels leading to the currently selected app when using complex navigation.
+        Returns
+        ---------
+        list of str, empty if not using complex navigation or the app is not within a section.
+        """
+
+        if self._nav_tree is None:
+            return []
+
+        return self._nav_tree.breadcrumb(self.session_state.selected_app)
+
+    def _run_command_palette(self):
+        with self._nav_container:
+            query = st.text_input('🔎 Quick jump', key='hydralit_command_palette')
+
+        if query:
+            allowed_apps = self._get_allowed_apps(int(self.session_state.allow_access))
+            if self._home_app is not None:
+                allowed_apps = allowed_apps | {self._home_id}
+
+            results = self._search_index.search(query, limit=8, allowed=allowed_apps)
+
+            if len(results) == 0:
+                self._nav_container.caption('No matching apps found.')
+
+            for app_id, app_title, nav_section_name in results:
+                if nav_section_name is not None:
+                    label = '{} › {}'.format(nav_section_name, app_title)
+                else:
+                    label = app_title
+
+                # jump using the same path as an internal redirect, the selected app is run later in this same script run
+                if self._nav_container.button(label=label, key='hydralit_palette_{}'.format(app_id)):
+                    self.session_state.other_nav_app = app_id
+
+    def _get_slug_index(self):
+        """
+        Return the lookup from url slug to app name, along with the reverse lookup, built once per process for each set of registered apps.
+        """
+
+        cache_key = (self._registry_key, self._home_id if self._home_app is not None else None)
+
+        slug_index = _SLUG_INDEX_CACHE.get(cache_key)
+        if slug_index is None:
+            app_names = list(self._apps.keys())
+            if self._home_app is not None:
+                app_names.insert(0, self._home_id)
+
+            app_slugs = {}
+            apps_by_slug = {}
+            for app_name in app_names:
+                app_slugs[app_name] = slugify(app_name)
+                # the first app registered keeps a slug shared by two titles, the other can still be linked by its title
+                apps_by_slug.setdefault(app_slugs[app_name], app_name)
+
+            for app_name in app_names:
+                apps_by_slug.setdefault(app_name, app_name)
+
+            slug_index = (apps_by_slug, app_slugs)
+            _SLUG_INDEX_CACHE[cache_key] = slug_index
+
+        return slug_index
+
     def _do_url_params(self):
-        if self._allow_url_nav:
+        # only a url that differs from the one last synced is a new request, a stale url left behind by menu navigation is ignored
+        slug = get_query_param('selected')
+        if slug is None or slug == self.session_state.url_app:
+            return
+
+        self.session_state.url_app = slug
+
+        apps_by_slug, _ = self._get_slug_index()
+        app_name = apps_by_slug.get(slug)
+
+        if app_name is not None and app_name != self.session_state.selected_app:
+            # run using the same path as an internal redirect, so the access check still applies
+            self.session_state.other_nav_app = app_name
+
+    def _navbar_first_select(self, menu_data):
+        # the navbar reports its initial item until it is clicked, so start it on the app from the url or a deep link only lasts a single run
+        if not self._allow_url_nav or self.session_state.url_app is None:
+            return 0
 
-            query_params = st.experimental_get_query_params()
-            if 'selected' in query_params:
-                # and (query_params['selected'])[0] != self.session_state.previous_app:
-                if (query_params['selected'])[0] != 'None' and (query_params['selected'])[0] != self.session_state.selected_app:
-                    self.session_state.other_nav_app = (
-                        query_params['selected'])[0]
+        apps_by_slug, _ = self._get_slug_index()
+        app_name = apps_by_slug.get(self.session_state.url_app)
+
+        # only top level items can be selected this way, the home item is always first
+        offset = int(self._home_app is not None)
+        for i, menu_item in enumerate(menu_data):
+            if menu_item.get('id') == app_name:
+                return (i + offset) * 10
+
+        return 0
+
+    def _sync_url(self, app_name):
+        if not self._allow_url_nav:
+            return
+
+        _, app_slugs = self._get_slug_index()
+        slug = app_slugs.get(app_name)
+
+        if slug is not None and slug != self.session_state.url_app:
+            self.session_state.url_app = slug
+            set_query_param('selected', slug)
 
     def enable_guest_access(self, guest_access_level=1, guest_username='guest'):
         """
@@ -616,41 +1639,46 @@ class HydraApp(object):
         ------------
         complex_nav: Dict
             A dictionary that indicates how the nav items should be structured, each key will be a section title and the value will be a list or array of the names of the apps (as registered with the add_app method). The sections with only a single item will be displayed directly, the sections with more than one will be wrapped in an exapnder for cleaner layout.
+            Sections can be nested by using a dict of sub-sections in place of the list, or as an item within the list. The nav structure is validated once and a ValueError is raised if an app name has not been registered.
         """
-        # process url navigation parameters
-        # self._do_url_params()
+
+        if self._trace_collector is None:
+            self._run(complex_nav)
+            return
+
+        self._tracer = Tracer(self._trace_collector, attributes={'hydralit.session_id': str(self._get_session_id())})
+
+        try:
+            with self._tracer.root_scope():
+                self._run(complex_nav)
+        finally:
+            self._tracer.root.set_attribute('hydralit.app', str(self.session_state.selected_app))
+            self._tracer.finish()
+
+    def _run(self, complex_nav):
+        if self._module_watcher is not None:
+            self._reload_changed_apps()
 
         self._complex_nav = complex_nav
+        if complex_nav is not None:
+            self._nav_tree = self._compile_nav_tree(complex_nav)
         # A hack to hide the hamburger button and Streamlit footer
         # if self._hide_streamlit_markings is not None:
         #    st.markdown(self._hide_streamlit_markings, unsafe_allow_html=True)
 
-        if self._banners is not None:
-            if isinstance(self._banners, str):
-                self._banners = [self._banners]
+        if self._degradation is not None:
+            self._degradation.touch_session(self._get_session_id())
+            self._degraded = self._degradation.is_degraded()
 
-            if self._banner_spacing is not None and len(self._banner_spacing) == len(self._banners):
-                cols = self._banner_container.columns(self._banner_spacing)
-                for idx, im in enumerate(self._banners):
-                    if im is not None:
-                        if isinstance(im, Dict):
-                            cols[idx].markdown(
-                                next(iter(im.values())), unsafe_allow_html=True)
-                        else:
-                            cols[idx].image(im)
-            else:
-                if self._banner_spacing is not None and len(self._banner_spacing) != len(self._banners):
-                    print(
-                        'WARNING: Banner spacing spec is a different length to the number of banners supplied, using even spacing for each banner.')
-
-                cols = self._banner_container.columns([1]*len(self._banners))
-                for idx, im in enumerate(self._banners):
-                    if im is not None:
-                        if isinstance(im, Dict):
-                            cols[idx].markdown(
-                                next(iter(im.values())), unsafe_allow_html=True)
-                        else:
-                            cols[idx].image(im)
+            if self._degraded:
+                self._navbar_animation = False
+
+        if self._banners is not None and not self._degraded:
+            self._render_banners()
+
+        with self.trace_span('access_check') as span:
+            self._check_cache_scope()
+            span.set_attribute('hydralit.access_level', int(self.session_state.allow_access))
 
         if self.session_state.allow_access > self._no_access_level or self._login_app is None:
             if callable(self._login_callback):
@@ -659,9 +1687,17 @@ class HydraApp(object):
                     self._login_callback()
 
             if self._nav_item_count == 0:
-                self._default()
+                self._render_cache.render((self._tenant_id, 'hydralit._default'), self._default)
             else:
+                # a deep link is only followed once logged in, so it survives a trip through the login app
+                if self._allow_url_nav:
+                    self._do_url_params()
+
                 self._build_nav_menu()
+
+                if self._use_command_palette:
+                    self._run_command_palette()
+
                 self._run_selected()
         elif self.session_state.allow_access < self._no_access_level:
             self.session_state.current_user = self._guest_name
@@ -672,6 +1708,21 @@ class HydraApp(object):
             self.session_state.access_hash = None
             self._login_app.run()
 
+        if self._session_memory is not None:
+            self._session_memory.account(self._get_session_id(), self.session_state, self._session_schema.spillable_keys)
+
+    @traced('render_banners')
+    def _render_banners(self):
+        cols = self._banner_container.columns(self._banner_spacing)
+        for idx, im in enumerate(self._banners):
+            if im is not None:
+                if isinstance(im, Dict):
+                    cols[idx].markdown(
+                        next(iter(im.values())), unsafe_allow_html=True)
+                else:
+                    # image files are only read and encoded from disk on the first run in this process
+                    cols[idx].image(load_banner(im, self._banner_max_width))
+
     def _default(self):
         st.header('Welcome to Hydralit')
         st.write('Thank you for your enthusiasum and looking to run the HydraApp as quickly as possible, for maximum effect, please add a child app by one of the methods below.')
@@ -773,7 +1824,7 @@ app.run()
         self._login_callback = my_wrap
         return my_wrap
 
-    def addapp(self, title=None, icon=None, is_home=False):
+    def addapp(self, title=None, icon=None, is_home=False, access_level=None, keywords=None):
         """
         This is a decorator to quickly add a function as a child app in a style like a Flask route.
 
@@ -788,6 +1839,10 @@ app.run()
             The icon to use on the navigation button, this will be appended to the title to be used on the navigation control.
         is_home: bool, False
             Is this the first 'page' that will be loaded, if a login app is provided, this is the page that will be kicked to upon successful login.
+        access_level: int, None
+            The minimum access level a user must have been granted to see and run this app.
+        keywords: list of str, None
+            Additional search terms that will match this app in the quick jump command palette.
         """
 
         def decorator(func):
@@ -801,7 +1856,7 @@ app.run()
                 app_icon = "fa fa-home"
 
             self.add_app(title=app_title, app=wrapped_app,
-                         icon=app_icon, is_home=is_home)
+                         icon=app_icon, is_home=is_home, access_level=access_level, keywords=keywords)
 
             return func
 
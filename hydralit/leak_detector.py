@@ -0,0 +1,166 @@
+import collections
+import contextlib
+import gc
+import random
+import threading
+import time
+import tracemalloc
+
+
+# allocations made by the measuring itself, or by the import machinery, are not the app's doing
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+class AppLeakReport(object):
+    """
+    The rolling record of the memory retained by a single child app across the navigations that were sampled.
+    """
+
+    def __init__(self, history=50, top_n=10):
+        self.top_n = top_n
+        self.samples = 0
+        self.total_growth = 0
+        self.growth = collections.deque(maxlen=history)
+        self.sites = collections.Counter()
+        self.last_sampled = None
+
+    def add(self, growth, site_growth):
+        self.samples += 1
+        self.total_growth += growth
+        self.growth.append(growth)
+        self.last_sampled = time.time()
+
+        self.sites.update(site_growth)
+
+        # keep the site table bounded, sites that have given their memory back fall away first
+        if len(self.sites) > self.top_n * 10:
+            self.sites = collections.Counter(dict(self.sites.most_common(self.top_n * 5)))
+
+    def to_dict(self):
+        recent = list(self.growth)
+
+        return {'samples': self.samples,
+                'total_growth': self.total_growth,
+                'mean_growth': self.total_growth / self.samples if self.samples else 0,
+                'recent_growth': recent,
+                'top_sites': [(site, size) for site, size in self.sites.most_common(self.top_n) if size > 0]}
+
+
+class LeakDetector(object):
+    """
+    Attributes the memory retained after each child app runs to that app, using tracemalloc snapshots taken around a sample of the navigations.
+
+    tracemalloc sees the allocations of the whole process, so only one navigation is measured at a time, navigations that start while another is being measured are not sampled. On a busy server the allocations of other sessions still land within a measurement, these average out across samples while the growth from a genuine leak accumulates.
+    """
+
+    def __init__(self, sample_rate=0.1, frames=1, history=50, top_n=10):
+        """
+        Parameters
+        ------------
+        sample_rate: float, 0.1
+            The fraction of navigations to measure.
+        frames: int, 1
+            The number of stack frames tracemalloc keeps for each allocation, only the innermost frame is used to name the allocation site, more frames cost more.
+        history: int, 50
+            The number of measurements to keep for each app.
+        top_n: int, 10
+            The number of allocation sites to report for each app.
+        """
+
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.history = history
+        self.top_n = top_n
+        self._reports = {}
+        self._measure_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, f) for f in _IGNORED_FILES])
+
+    @contextlib.contextmanager
+    def measure(self, app_name):
+        """
+        A context manager that measures the memory retained by the block, if this navigation is sampled, and adds it to the report for the app.
+        """
+
+        if random.random() >= self.sample_rate or not self._measure_lock.acquire(blocking=False):
+            yield
+            return
+
+        # tracing is only on while a sampled navigation runs, so the other navigations pay nothing for it
+        owns_tracing = not tracemalloc.is_tracing()
+
+        try:
+            gc.collect()
+
+            if owns_tracing:
+                # every allocation still traced at the end was made by the block
+                before = None
+                tracemalloc.start(self.frames)
+            else:
+                before = self._snapshot()
+
+            try:
+                yield
+
+                # only what survives a collection counts as retained
+                gc.collect()
+                after = self._snapshot()
+            finally:
+                if owns_tracing:
+                    tracemalloc.stop()
+
+            if before is None:
+                site_growth = {stat.traceback[0]: stat.size for stat in after.statistics('lineno')}
+            else:
+                site_growth = {stat.traceback[0]: stat.size_diff for stat in after.compare_to(before, 'lineno')}
+
+            growth = sum(site_growth.values())
+            site_growth = {'{}:{}'.format(frame.filename, frame.lineno): size for frame, size in site_growth.items() if size != 0}
+
+            with self._lock:
+                report = self._reports.get(app_name)
+                if report is None:
+                    report = self._reports[app_name] = AppLeakReport(self.history, self.top_n)
+
+                report.add(growth, site_growth)
+        finally:
+            self._measure_lock.release()
+
+    def report(self, app_name=None):
+        """
+        Return the leak reports, keyed by app name, or just the report for the app if one is given.
+
+        Each report has the number of navigations sampled ('samples'), the total and mean bytes retained per navigation ('total_growth', 'mean_growth'), the bytes retained by each recent navigation ('recent_growth') and the allocation sites that have retained the most memory ('top_sites').
+        """
+
+        with self._lock:
+            if app_name is not None:
+                report = self._reports.get(app_name)
+                return None if report is None else report.to_dict()
+
+            return {name: report.to_dict() for name, report in self._reports.items()}
+
+    def reset(self):
+        with self._lock:
+            self._reports = {}
+
+
+_DETECTOR = None
+_DETECTOR_LOCK = threading.Lock()
+
+
+def get_leak_detector(**options):
+    """
+    Return the process wide leak detector, it is created with the options given on the first call.
+    """
+
+    global _DETECTOR
+
+    if _DETECTOR is None:
+        with _DETECTOR_LOCK:
+            if _DETECTOR is None:
+                _DETECTOR = LeakDetector(**options)
+
+    return _DETECTOR
@@ -0,0 +1,45 @@
+import streamlit as st
+import pandas as pd
+from hydralit.app_template import HydraHeadApp
+from hydralit.leak_detector import get_leak_detector
+
+
+class LeakReportApp(HydraHeadApp):
+    """
+    An admin app showing the memory retained by each child app per navigation, as measured when the parent app is created with leak_detection=True.
+
+    Add it like any other app, with an access level that keeps it to administrators.
+    """
+
+    def __init__(self, title='Memory Leaks'):
+        self.title = title
+
+    def run(self):
+        st.subheader(self.title)
+
+        detector = get_leak_detector()
+        reports = detector.report()
+
+        if len(reports) == 0:
+            st.info('No navigations have been sampled yet, leak detection must be turned on with HydraApp(leak_detection=True).')
+            return
+
+        summary = pd.DataFrame([{'app': app_name, 'samples': report['samples'],
+                                 'mean growth (KiB)': report['mean_growth'] / 1024,
+                                 'total growth (KiB)': report['total_growth'] / 1024}
+                                for app_name, report in reports.items()])
+        st.dataframe(summary.sort_values('mean growth (KiB)', ascending=False), use_container_width=True)
+
+        app_name = st.selectbox('App', list(reports.keys()), key='hydralit_leak_report_app')
+        report = reports[app_name]
+
+        if len(report['recent_growth']) > 0:
+            st.caption('Bytes retained by each sampled navigation, oldest first')
+            st.bar_chart(pd.DataFrame({'growth': report['recent_growth']}))
+
+        st.caption('Allocation sites that have retained the most memory')
+        st.dataframe(pd.DataFrame(report['top_sites'], columns=['site', 'bytes']), use_container_width=True)
+
+        if st.button('Reset reports', key='hydralit_leak_report_reset'):
+            detector.reset()
+            st.experimental_rerun()
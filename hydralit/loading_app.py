@@ -8,6 +8,12 @@ class LoadingApp(HydraHeadApp):
     def run(self,app_target):
 
         try:
+            # apps that declare sections show their own skeletons, which say more than a full page loader
+            sections = app_target.sections() if hasattr(app_target,'sections') else None
+            if sections:
+                app_target.render_sections(sections)
+                return
+
             app_title = ''
             if hasattr(app_target,'title'):
                 app_title = app_target.title
@@ -18,3 +24,23 @@ class LoadingApp(HydraHeadApp):
         except Exception as e:
             raise e
 
+    def queue_status(self,app_target,position,container):
+        """
+        Called while the user is waiting in the admission queue for an app that has a concurrency limit.
+
+        Parameters
+        ------------
+        app_target: HydraHeadApp
+            The app the user is waiting to run.
+        position: int
+            The position of the user within the queue, 1 is next in line.
+        container: Streamlit.empty
+            The placeholder to draw the queue status in, it is cleared once the app is admitted.
+        """
+
+        app_title = ''
+        if hasattr(app_target,'title'):
+            app_title = app_target.title
+
+        container.info('⏳ {} is busy, you are number {} in the queue.'.format(app_title or 'This app',position))
+
@@ -0,0 +1,239 @@
+import threading
+
+
+class NavNode(object):
+    """
+    A single entry within the navigation tree, either a section holding child entries or a leaf pointing to a registered app.
+    """
+
+    __slots__ = ('id', 'label', 'app_id', 'parent', 'children', 'depth')
+
+    def __init__(self, node_id, label, app_id=None, parent=None):
+        self.id = node_id
+        self.label = label
+        self.app_id = app_id
+        self.parent = parent
+        self.children = []
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    @property
+    def is_section(self):
+        return self.app_id is None
+
+    def path(self):
+        """
+        Return the nodes from the top level section down to this node.
+        """
+
+        nodes = []
+        node = self
+        while node is not None and node.parent is not None:
+            nodes.append(node)
+            node = node.parent
+
+        return nodes[::-1]
+
+    def leaves(self):
+        """
+        Return all the app nodes below this node, in menu order.
+        """
+
+        if not self.is_section:
+            return [self]
+
+        app_nodes = []
+        for child in self.children:
+            app_nodes.extend(child.leaves())
+
+        return app_nodes
+
+
+class NavTree(object):
+    """
+    A compiled and validated navigation tree, built from the complex_nav specification passed to HydraApp.run.
+
+    The specification is a dict of section names, each value is a list of registered app names, a nested dict of sub-sections, or a list mixing app names and nested dicts. Sections can be nested to any depth.
+    Every app node keeps a pointer to its parent so breadcrumbs and the active path can be found in O(depth), the serialised navbar and button layouts are built once for each access level and reused.
+    """
+
+    def __init__(self, complex_nav, known_apps, skip_sections=()):
+        """
+        Parameters
+        ------------
+        complex_nav: Dict
+            The nav specification, section names mapped to the apps or sub-sections they contain.
+        known_apps: collection of str
+            The names of all the registered apps, every app named in the specification must be within this collection.
+        skip_sections: collection of str
+            Top level section names that are handled separately and should not appear in the tree, such as the home and logout entries.
+
+        Raises
+        --------
+        ValueError
+            If the specification is malformed or references an app that has not been registered.
+        """
+
+        self.root = NavNode(None, None)
+        self._app_nodes = {}
+        self._menu_cache = {}
+        self._layout_cache = {}
+        self._lock = threading.Lock()
+
+        if not isinstance(complex_nav, dict):
+            raise ValueError('complex_nav must be a dict of section names to the apps they contain, not {}.'.format(type(complex_nav).__name__))
+
+        unknown_apps = []
+        for section_name, section_items in complex_nav.items():
+            if section_name in skip_sections:
+                continue
+
+            self._add_section(self.root, section_name, section_items, known_apps, unknown_apps)
+
+        if len(unknown_apps) > 0:
+            raise ValueError('complex_nav references apps that have not been added: {}'.format(', '.join(repr(a) for a in unknown_apps)))
+
+    def _add_section(self, parent, section_name, section_items, known_apps, unknown_apps):
+        if parent.id is None:
+            node_id = str(section_name)
+        else:
+            node_id = '{}/{}'.format(parent.id, section_name)
+
+        section = NavNode(node_id, section_name, parent=parent)
+        parent.children.append(section)
+
+        if isinstance(section_items, dict):
+            section_items = [section_items]
+        elif isinstance(section_items, str) or not hasattr(section_items, '__iter__'):
+            raise ValueError('The items for nav section {} must be a list of app names or a dict of sub-sections.'.format(repr(node_id)))
+
+        for item in section_items:
+            if isinstance(item, dict):
+                for sub_name, sub_items in item.items():
+                    self._add_section(section, sub_name, sub_items, known_apps, unknown_apps)
+            elif item not in known_apps:
+                unknown_apps.append(item)
+            elif item in self._app_nodes:
+                raise ValueError('App {} appears more than once in complex_nav.'.format(repr(item)))
+            else:
+                app_node = NavNode('{}/{}'.format(node_id, item), item, app_id=item, parent=section)
+                section.children.append(app_node)
+                self._app_nodes[item] = app_node
+
+    @property
+    def sections(self):
+        return self.root.children
+
+    def app_ids(self):
+        return self._app_nodes.keys()
+
+    def get_node(self, app_id):
+        return self._app_nodes.get(app_id)
+
+    def active_path(self, app_id):
+        """
+        Return the ids of the sections and app node leading to the app, an empty list if the app is not within the tree.
+        """
+
+        node = self._app_nodes.get(app_id)
+        if node is None:
+            return []
+
+        return [n.id for n in node.path()]
+
+    def breadcrumb(self, app_id):
+        """
+        Return the section labels leading to the app, an empty list if the app is not within the tree.
+        """
+
+        node = self._app_nodes.get(app_id)
+        if node is None:
+            return []
+
+        return [n.label for n in node.path()[:-1]]
+
+    def section_label(self, app_id, separator=' › '):
+        return separator.join(str(label) for label in self.breadcrumb(app_id)) or None
+
+    def _visible_leaves(self, section, allowed_apps):
+        return [n for n in section.leaves() if allowed_apps is None or n.app_id in allowed_apps]
+
+    def navbar_menu(self, cache_key, labels, allowed_apps=None):
+        """
+        Serialise the tree into the menu definition used by the Hydralit navbar.
+
+        The navbar only supports a single level of submenus, so apps within nested sections are flattened into their top level section with the sub-section path prefixed to the label.
+
+        Parameters
+        ------------
+        cache_key: hashable
+            The key to cache the serialised menu under, typically the access level of the user.
+        labels: Dict
+            The app name mapped to the [title, icon] pair used on the navbar.
+        allowed_apps: set, None
+            If provided, only the apps within this collection will appear in the menu.
+        """
+
+        menu_data = self._menu_cache.get(cache_key)
+        if menu_data is not None:
+            return menu_data
+
+        menu_data = []
+        for section in self.sections:
+            leaves = self._visible_leaves(section, allowed_apps)
+
+            if len(leaves) == 1 and leaves[0].parent is section:
+                menu_data.append({'label': labels[leaves[0].app_id][0], 'id': leaves[0].app_id, 'icon': labels[leaves[0].app_id][1]})
+            elif len(leaves) > 0:
+                submenu_items = []
+                for leaf in leaves:
+                    label = labels[leaf.app_id][0]
+                    sub_path = [str(n.label) for n in leaf.path()[1:-1]]
+                    if len(sub_path) > 0:
+                        label = '{} › {}'.format(' › '.join(sub_path), label)
+
+                    submenu_items.append({'label': label, 'id': leaf.app_id, 'icon': labels[leaf.app_id][1]})
+
+                menu_data.append({'label': section.label, 'id': section.id, 'submenu': submenu_items})
+
+        with self._lock:
+            self._menu_cache[cache_key] = menu_data
+
+        return menu_data
+
+    def button_layout(self, cache_key, allowed_apps=None):
+        """
+        Serialise the tree into the layout used by the Streamlit button and expander menu.
+
+        Returns
+        ---------
+        list of tuple: (section_label, entries), one per top level section with visible apps, the entries are (depth, label, app_id) tuples where the app_id is None for a nested sub-section heading.
+        """
+
+        layout = self._layout_cache.get(cache_key)
+        if layout is not None:
+            return layout
+
+        layout = []
+        for section in self.sections:
+            entries = []
+            self._collect_entries(section, allowed_apps, entries)
+
+            if len(entries) > 0:
+                layout.append((section.label, entries))
+
+        with self._lock:
+            self._layout_cache[cache_key] = layout
+
+        return layout
+
+    def _collect_entries(self, section, allowed_apps, entries):
+        for child in section.children:
+            if child.is_section:
+                sub_entries = []
+                self._collect_entries(child, allowed_apps, sub_entries)
+
+                if len(sub_entries) > 0:
+                    entries.append((child.depth - 1, child.label, None))
+                    entries.extend(sub_entries)
+            elif allowed_apps is None or child.app_id in allowed_apps:
+                entries.append((child.depth - 1, child.label, child.app_id))
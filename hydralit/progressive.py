@@ -0,0 +1,96 @@
+from concurrent.futures import as_completed
+import streamlit as st
+from hydralit.circuit_breaker import is_script_control
+from hydralit import worker_pool
+
+
+_SKELETON_STYLE = """
+<style>
+@keyframes hydralit-skeleton {0% {background-position: 100% 0;} 100% {background-position: -100% 0;}}
+.hydralit-skeleton {border-radius: 0.5rem; margin-bottom: 0.5rem;
+    background: linear-gradient(90deg, rgba(128,128,128,0.12) 25%, rgba(128,128,128,0.24) 50%, rgba(128,128,128,0.12) 75%);
+    background-size: 200% 100%; animation: hydralit-skeleton 1.4s ease-in-out infinite;}
+</style>
+"""
+
+
+class Section(object):
+    """
+    A part of a page that is drawn as soon as its own data is ready, as returned from HydraHeadApp.sections().
+    """
+
+    def __init__(self, name, draw, load=None, height=120):
+        """
+        Parameters
+        ------------
+        name: str
+            The name of the section, used in error messages.
+        draw: callable
+            Draws the section with Streamlit elements, called on the script thread with the value returned by load, or with no arguments if there is no load function.
+        load: callable, None
+            Fetches the data for the section, run in the shared worker pool together with the loads of the other sections. It runs with the session's script run context, so st.cache_data and the session state can be used, but it must not call any Streamlit elements.
+        height: int, 120
+            The height in pixels of the skeleton placeholder shown until the section is drawn.
+        """
+
+        self.name = name
+        self.draw = draw
+        self.load = load
+        self.height = height
+
+
+def skeleton_html(height):
+    return '<div class="hydralit-skeleton" style="height: {}px;"></div>'.format(int(height))
+
+
+def render_sections(sections):
+    """
+    Draw a skeleton placeholder for every section straight away, start loading the data of all the sections concurrently, then fill in each section as soon as its data is ready, in whatever order that happens.
+
+    Sections without a load function are drawn first, so headers and other fast parts of the page appear before any data has loaded.
+    """
+
+    st.markdown(_SKELETON_STYLE, unsafe_allow_html=True)
+
+    placeholders = []
+    for section in sections:
+        placeholder = st.empty()
+        placeholder.markdown(skeleton_html(section.height), unsafe_allow_html=True)
+        placeholders.append(placeholder)
+
+    futures = {}
+    for i, section in enumerate(sections):
+        if section.load is not None:
+            futures[worker_pool.submit(section.load)] = i
+
+    for i, section in enumerate(sections):
+        if section.load is None:
+            _fill_section(placeholders[i], section)
+
+    for future in as_completed(futures):
+        i = futures[future]
+
+        try:
+            data = future.result()
+        except Exception as e:
+            with placeholders[i].container():
+                st.error('😭 Error loading section: **{}**'.format(sections[i].name))
+                st.error('Details: {}'.format(e))
+            continue
+
+        _fill_section(placeholders[i], sections[i], data, has_data=True)
+
+
+def _fill_section(placeholder, section, data=None, has_data=False):
+    with placeholder.container():
+        try:
+            if has_data:
+                section.draw(data)
+            else:
+                section.draw()
+        except Exception as e:
+            if is_script_control(e):
+                raise
+
+            st.error('😭 Error drawing section: **{}**'.format(section.name))
+            st.error('Details: {}'.format(e))
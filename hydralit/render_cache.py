@@ -0,0 +1,336 @@
+import collections
+import contextlib
+import threading
+import time
+
+
+# elements that look the same for every user and don't talk back to the script, anything else makes a page uncacheable
+STATIC_ELEMENTS = {'markdown', 'heading', 'code', 'alert', 'text', 'json', 'metric', 'empty', 'html'}
+
+
+def _get_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        from streamlit.scriptrunner import get_script_run_ctx
+
+    return get_script_run_ctx()
+
+
+# recording and replay lean on private Streamlit internals (the enqueue of the script context, st._main._active_dg and the
+# _enqueue and _block of DeltaGenerator) that move between releases, they are checked for once and any failure in them turns
+# the cache off for the process, so every page is then drawn by its app as normal
+_SUPPORTED = None
+
+
+def _has_internals():
+    try:
+        from streamlit.delta_generator import DeltaGenerator
+    except ImportError:
+        return False
+
+    return callable(getattr(DeltaGenerator, '_enqueue', None)) and callable(getattr(DeltaGenerator, '_block', None))
+
+
+def _is_supported(ctx):
+    global _SUPPORTED
+
+    if _SUPPORTED is None:
+        _SUPPORTED = _has_internals()
+
+    return _SUPPORTED and callable(getattr(ctx, 'enqueue', None)) and _get_main_dg() is not None
+
+
+def _disable():
+    global _SUPPORTED
+    _SUPPORTED = False
+
+
+def _get_main_dg():
+    import streamlit as st
+
+    return getattr(getattr(st, '_main', None), '_active_dg', None)
+
+
+@contextlib.contextmanager
+def _hook_enqueue(ctx, hook):
+    # every element and block Streamlit sends passes through the enqueue of the session's script context
+    original = ctx.enqueue
+    ctx.enqueue = lambda msg: original(hook(msg))
+
+    try:
+        yield
+    finally:
+        ctx.enqueue = original
+
+
+class RenderRecording(object):
+    """
+    The element and block messages drawn by a single run of a static app, with their positions relative to the container the app was drawn in.
+    """
+
+    __slots__ = ('entries', 'size', 'expires')
+
+    def __init__(self, entries, size, expires):
+        self.entries = entries
+        self.size = size
+        self.expires = expires
+
+
+class RenderCache(object):
+    """
+    A process wide cache of the rendered element messages of static apps, the first run of an app is recorded as it is sent to the browser and later visits replay the recorded messages without running any of the app code.
+
+    Only pages made entirely of static elements (markdown, headings, code, alerts, text, json, metrics and placeholders) within layout blocks such as columns, tabs and expanders are cached, a page with widgets, media or charts is marked uncacheable and run as normal.
+
+    The recording and replay use private Streamlit internals, on a Streamlit release where they are missing or behave differently the cache turns itself off and every page is drawn by its app.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        Parameters
+        ------------
+        max_bytes: int, 32MB
+            The most bytes of recorded messages to hold, the least recently used pages are dropped first.
+        """
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._recordings = collections.OrderedDict()
+        self._size = 0
+        self._uncacheable = set()
+
+    def get(self, key):
+        with self._lock:
+            recording = self._recordings.get(key)
+
+            if recording is not None and recording.expires is not None and recording.expires < time.monotonic():
+                self._remove(key)
+                recording = None
+
+            if recording is None:
+                self.misses += 1
+                return None
+
+            self._recordings.move_to_end(key)
+            self.hits += 1
+            return recording
+
+    def is_cacheable(self, key):
+        return key not in self._uncacheable
+
+    def render(self, key, render_func, ttl=None):
+        """
+        Replay the recorded page for the key, or call render_func to draw it, recording the page if it is cacheable.
+
+        Parameters
+        ------------
+        key: str
+            The unique name of the page.
+        render_func: callable
+            Draws the page with Streamlit elements.
+        ttl: float, None
+            The number of seconds the recording is valid for, None for no expiry.
+        """
+
+        ctx = _get_ctx()
+        if ctx is None or not self.is_cacheable(key) or not _is_supported(ctx):
+            render_func()
+            return
+
+        recording = self.get(key)
+        if recording is not None:
+            try:
+                self._replay(ctx, recording)
+                return
+            except (AttributeError, TypeError, ValueError, KeyError):
+                # this Streamlit release doesn't take the private calls the way the cache uses them, the first replayed
+                # element fails before anything is drawn, so the page is simply drawn by the app instead
+                _disable()
+                self.invalidate()
+                render_func()
+                return
+
+        self._record(ctx, key, render_func, ttl)
+
+    def _record(self, ctx, key, render_func, ttl):
+        messages = []
+        failed = []
+
+        def record(msg):
+            try:
+                copy = type(msg)()
+                copy.CopyFrom(msg)
+                messages.append(copy)
+            except Exception as e:
+                # never let the recording get in the way of the message reaching the browser
+                failed.append(e)
+            return msg
+
+        hooks = contextlib.ExitStack()
+        try:
+            hooks.enter_context(_hook_enqueue(ctx, record))
+        except (AttributeError, TypeError):
+            # the script context can't be hooked in this Streamlit release
+            _disable()
+            render_func()
+            return
+
+        with hooks:
+            render_func()
+
+        if failed:
+            _disable()
+            return
+
+        try:
+            entries = self._build_entries(messages)
+        except (AttributeError, TypeError, ValueError):
+            # the message layout is not the one the cache knows
+            _disable()
+            return
+
+        if entries is None:
+            self._uncacheable.add(key)
+            return
+
+        size = sum(msg.ByteSize() for msg in messages)
+        expires = None if ttl is None else time.monotonic() + ttl
+
+        with self._lock:
+            self._remove(key)
+            self._recordings[key] = RenderRecording(entries, size, expires)
+            self._size += size
+
+            while self._size > self.max_bytes and len(self._recordings) > 0:
+                self._remove(next(iter(self._recordings)))
+
+    def _build_entries(self, messages):
+        # map each message to the position it was drawn at, relative to the container the page was drawn in, None if the page can't be replayed
+        if len(messages) == 0:
+            return None
+
+        base = tuple(messages[0].metadata.delta_path)[:-1]
+        known_blocks = {()}
+        known_elements = set()
+        entries = []
+
+        for msg in messages:
+            if msg.WhichOneof('type') != 'delta':
+                return None
+
+            path = tuple(msg.metadata.delta_path)
+            if path[:len(base)] != base:
+                # drawn outside the app's container, such as in the sidebar
+                return None
+
+            path = path[len(base):]
+            delta_type = msg.delta.WhichOneof('type')
+
+            if delta_type == 'new_element':
+                element_type = msg.delta.new_element.WhichOneof('type')
+                if element_type not in STATIC_ELEMENTS:
+                    return None
+
+                if path in known_blocks:
+                    return None
+                elif path not in known_elements and path[:-1] not in known_blocks:
+                    return None
+
+                known_elements.add(path)
+                entries.append((path, 'element', element_type, msg.delta.new_element))
+
+            elif delta_type == 'add_block':
+                if path in known_blocks or path in known_elements or path[:-1] not in known_blocks:
+                    return None
+
+                known_blocks.add(path)
+                entries.append((path, 'block', None, msg.delta.add_block))
+
+            else:
+                return None
+
+        return entries
+
+    def _replay(self, ctx, recording):
+        containers = {(): _get_main_dg()}
+        elements = {}
+        pending = []
+
+        def restore(msg):
+            # put back the parts of the element the public call doesn't carry, such as its width and height
+            if pending and msg.WhichOneof('type') == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                msg.delta.new_element.CopyFrom(pending.pop())
+            return msg
+
+        with _hook_enqueue(ctx, restore):
+            for path, kind, element_type, proto in recording.entries:
+                if kind == 'block':
+                    containers[path] = containers[path[:-1]]._block(proto)
+                    continue
+
+                target = elements[path] if path in elements else containers[path[:-1]]
+                pending.append(proto)
+                elements[path] = target._enqueue(element_type, getattr(proto, element_type))
+                del pending[:]
+
+    def _remove(self, key):
+        recording = self._recordings.pop(key, None)
+        if recording is not None:
+            self._size -= recording.size
+
+    def invalidate(self, key=None):
+        """
+        Drop the recording for the key, or all the recordings if no key is given, the page will be recorded again on its next visit.
+        """
+
+        with self._lock:
+            if key is None:
+                self._recordings.clear()
+                self._size = 0
+                self._uncacheable.clear()
+            else:
+                self._remove(key)
+                self._uncacheable.discard(key)
+
+    def invalidate_app(self, app_name):
+        """
+        Drop the recordings of the app under every scope, for keys of the form (scope, app_name).
+        """
+
+        with self._lock:
+            for key in [k for k in list(self._recordings) + list(self._uncacheable) if isinstance(k, tuple) and k[-1] == app_name]:
+                self._remove(key)
+                self._uncacheable.discard(key)
+
+    def stats(self):
+        """
+        Return the number of pages held, their size in bytes, the hits, misses and hit rate, and the number of pages found to be uncacheable.
+        """
+
+        lookups = self.hits + self.misses
+
+        return {'entries': len(self._recordings), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'uncacheable': len(self._uncacheable),
+                'supported': _SUPPORTED is not False}
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_render_cache():
+    """
+    Return the process wide render cache.
+    """
+
+    global _CACHE
+
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = RenderCache()
+
+    return _CACHE
@@ -0,0 +1,87 @@
+import streamlit as st
+
+
+def get_query_param(name, default=None):
+    """
+    Return the first value of a url query parameter, using st.query_params where available and the older experimental API otherwise.
+    """
+
+    query_params = getattr(st, 'query_params', None)
+    if query_params is not None:
+        return query_params.get(name, default)
+
+    values = st.experimental_get_query_params().get(name)
+    if not values:
+        return default
+
+    return values[0]
+
+
+def get_request_header(name):
+    """
+    Return a header of the browser request that opened the session, or None if it is not available.
+    """
+
+    context = getattr(st, 'context', None)
+    if context is not None:
+        try:
+            return context.headers.get(name)
+        except Exception:
+            return None
+
+    try:
+        from streamlit.web.server.websocket_headers import _get_websocket_headers
+    except ImportError:
+        return None
+
+    headers = _get_websocket_headers()
+    if headers is None:
+        return None
+
+    return headers.get(name) or headers.get(name.title())
+
+
+def set_query_param(name, value):
+    """
+    Set a url query parameter, keeping the other parameters in the url, the browser address is updated without a rerun.
+    """
+
+    query_params = getattr(st, 'query_params', None)
+    if query_params is not None:
+        query_params[name] = value
+        return
+
+    params = st.experimental_get_query_params()
+    params[name] = value
+    st.experimental_set_query_params(**params)
+
+
+def slugify(name):
+    """
+    Return the url friendly form of an app name, lower case words joined by dashes.
+    """
+
+    return '-'.join(''.join(c if c.isalnum() else ' ' for c in str(name).lower()).split())
+
+
+def get_request_ip(trusted_proxies=0):
+    """
+    Return the address of the browser that opened the session, or None if it is not available.
+
+    The client writes whatever it likes into the X-Forwarded-For header, only the entries appended by proxies in front of the app can be believed, so the header is only read when there are trusted proxies and the address is taken from the right, the one the outermost trusted proxy saw the request come from.
+
+    Parameters
+    ------------
+    trusted_proxies: int, 0
+        The number of proxies in front of the app that append to the X-Forwarded-For header, 0 to ignore the header and use the address of the connection.
+    """
+
+    if trusted_proxies > 0:
+        forwarded = get_request_header('X-Forwarded-For')
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+            if len(hops) >= trusted_proxies:
+                return hops[-trusted_proxies]
+
+    context = getattr(st, 'context', None)
+    return getattr(context, 'ip_address', None)
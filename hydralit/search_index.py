@@ -0,0 +1,167 @@
+import re
+import threading
+
+
+def _normalise(text):
+    return re.sub(r'[^\w]+', ' ', str(text).lower()).strip()
+
+
+def _trigrams(text):
+    grams = set()
+    for token in text.split():
+        # pad the start of each word so that word prefixes are favoured over inner matches
+        padded = '  {}'.format(token)
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+
+    return grams
+
+
+class AppSearchIndex(object):
+    """
+    A trigram and prefix index over the titles, section names and keywords of registered apps, used to power the quick jump command palette.
+
+    The index is updated incrementally as apps are registered, re-adding an app with the same details is a no-op, so the index is only rebuilt for apps that actually change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._trigram_postings = {}
+        self._prefix_postings = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, app_id, title=None, section=None, keywords=None):
+        """
+        Add or update an app within the index.
+
+        Parameters
+        ------------
+        app_id: str
+            The registered name of the app, this is the value returned from a search.
+        title: str, None
+            The menu title of the app, if None, the app_id is used.
+        section: str, None
+            The name of the nav section the app has been placed in.
+        keywords: list of str, None
+            Extra search terms that should match the app.
+        """
+
+        if title is None:
+            title = app_id
+
+        existing = self._entries.get(app_id)
+        if existing is not None:
+            if section is None:
+                section = existing[1]
+            if keywords is None:
+                keywords = existing[2]
+
+        keywords = tuple(keywords) if keywords else ()
+        entry = (str(title), section, keywords)
+
+        if existing is not None and existing[:3] == entry:
+            return
+
+        text = _normalise(' '.join([entry[0], section or ''] + list(keywords)))
+        tokens = set(text.split())
+        grams = _trigrams(text)
+
+        with self._lock:
+            self._remove(app_id)
+            self._entries[app_id] = entry + (grams, tokens)
+
+            for gram in grams:
+                self._trigram_postings.setdefault(gram, set()).add(app_id)
+
+            for token in tokens:
+                for i in range(1, min(len(token), 3) + 1):
+                    self._prefix_postings.setdefault(token[:i], set()).add(app_id)
+
+    def remove(self, app_id):
+        """
+        Remove an app from the index.
+        """
+
+        with self._lock:
+            self._remove(app_id)
+
+    def _remove(self, app_id):
+        entry = self._entries.pop(app_id, None)
+        if entry is None:
+            return
+
+        for gram in entry[3]:
+            postings = self._trigram_postings.get(gram)
+            if postings is not None:
+                postings.discard(app_id)
+                if not postings:
+                    del self._trigram_postings[gram]
+
+        for token in entry[4]:
+            for i in range(1, min(len(token), 3) + 1):
+                postings = self._prefix_postings.get(token[:i])
+                if postings is not None:
+                    postings.discard(app_id)
+                    if not postings:
+                        del self._prefix_postings[token[:i]]
+
+    def search(self, query, limit=10, allowed=None):
+        """
+        Find the apps that best match the query text.
+
+        Parameters
+        ------------
+        query: str
+            The text entered by the user.
+        limit: int, 10
+            The maximum number of results to return.
+        allowed: set, None
+            If provided, only apps within this collection will be returned.
+
+        Returns
+        ---------
+        list of tuple: (app_id, title, section), best match first.
+        """
+
+        text = _normalise(query)
+        if not text:
+            return []
+
+        scores = {}
+        results = []
+        query_tokens = text.split()
+
+        with self._lock:
+            if len(text) < 3:
+                # too short for trigrams, use the word prefixes instead
+                for app_id in self._prefix_postings.get(query_tokens[0], ()):
+                    scores[app_id] = 1.0
+            else:
+                query_grams = _trigrams(text)
+                for gram in query_grams:
+                    for app_id in self._trigram_postings.get(gram, ()):
+                        scores[app_id] = scores.get(app_id, 0) + 1
+
+                for app_id in scores:
+                    scores[app_id] /= float(len(query_grams))
+
+            for app_id, score in scores.items():
+                if allowed is not None and app_id not in allowed:
+                    continue
+
+                entry = self._entries[app_id]
+                title = _normalise(entry[0])
+                if title.startswith(text):
+                    score += 1.0
+                elif any(token.startswith(query_tokens[-1]) for token in entry[4]):
+                    score += 0.5
+
+                if score >= 0.3:
+                    results.append((score, app_id, entry[0], entry[1]))
+
+        results.sort(key=lambda r: (-r[0], r[2]))
+
+        return [(app_id, title, section) for score, app_id, title, section in results[:limit]]
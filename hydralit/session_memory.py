@@ -0,0 +1,275 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import compress_pickle as cp
+
+
+def estimate_size(value, _depth=0):
+    """
+    Return the approximate number of bytes held by a value, DataFrames and arrays report their buffer sizes, containers are walked a couple of levels deep.
+    """
+
+    if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+        try:
+            return int(value.memory_usage(deep=True).sum())
+        except Exception:
+            pass
+
+    if hasattr(value, 'nbytes'):
+        try:
+            return int(value.nbytes)
+        except Exception:
+            pass
+
+    size = sys.getsizeof(value)
+
+    if _depth < 2:
+        if isinstance(value, dict):
+            size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(estimate_size(v, _depth + 1) for v in value)
+
+    return size
+
+
+class SpilledValue(object):
+    """
+    A placeholder left in the session store for a value that has been written to the disk cache.
+    """
+
+    __slots__ = ('path', 'size', 'type_name')
+
+    def __init__(self, path, size, type_name):
+        self.path = path
+        self.size = size
+        self.type_name = type_name
+
+    def load(self):
+        return cp.load(self.path, compression='gzip')
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __repr__(self):
+        return '<SpilledValue {} ({:,} bytes)>'.format(self.type_name, self.size)
+
+
+class SessionMemoryManager(object):
+    """
+    Tracks the approximate size of every key in each session store and enforces per-session and global memory budgets.
+
+    When a budget is exceeded the least recently used large values of the current session are written to a local disk cache with compress_pickle and replaced by a SpilledValue placeholder, the value is read back the next time it is requested through HydraApp.get_session_value.
+    Only the keys declared as spillable are ever written to disk, as a direct read of the session store can't restore the value, every other key is measured towards the budgets but kept in memory.
+    """
+
+    def __init__(self, session_budget=None, global_budget=None, spill_threshold=1024 * 1024, spill_dir=None, session_timeout=3600):
+        """
+        Parameters
+        ------------
+        session_budget: int, None
+            The number of bytes each session may hold before values are spilled, None for no limit.
+        global_budget: int, None
+            The number of bytes all sessions together may hold before values are spilled, None for no limit.
+        spill_threshold: int, 1MB
+            Only values at least this large will be spilled to disk.
+        spill_dir: str, None
+            Where to write spilled values, defaults to a folder within the system temp directory.
+        session_timeout: float, 3600
+            Sessions that have not run for this many seconds are forgotten and their spilled values removed, a session that comes back later gets the defaults for those keys.
+        """
+
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), 'hydralit_spill')
+        self.session_timeout = session_timeout
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._last_seen = {}
+        self._totals = {}
+        self._spill_paths = {}
+        self._spill_count = 0
+
+    def account(self, session_id, session_state, spillable_keys=frozenset()):
+        """
+        Measure the session store and spill values of the spillable keys if a budget is exceeded, called at the end of each run.
+        """
+
+        now = time.monotonic()
+        previous = self._sessions.get(session_id, {})
+        usage = {}
+
+        for key in list(session_state.keys()):
+            value = session_state[key]
+            entry = previous.get(key)
+
+            if entry is not None and entry[0] == id(value):
+                # the same object as the last run, don't pay to measure it again
+                usage[key] = entry
+            elif isinstance(value, SpilledValue):
+                usage[key] = (id(value), 0, entry[2] if entry is not None else now, value.size)
+            else:
+                usage[key] = (id(value), estimate_size(value), now, 0)
+
+        # spilled values that have since been replaced or deleted by the app are no longer needed on disk
+        spill_paths = self._spill_paths.get(session_id, {})
+        for key in [k for k in spill_paths if not isinstance(session_state.get(k), SpilledValue)]:
+            self._remove_file(spill_paths.pop(key))
+
+        with self._lock:
+            self._sessions[session_id] = usage
+            self._last_seen[session_id] = now
+            self._totals[session_id] = sum(e[1] for e in usage.values())
+            self._forget_idle_sessions(now)
+
+        self._enforce(session_id, session_state, spillable_keys)
+
+    def touch(self, session_id, key):
+        """
+        Mark a key as recently used.
+        """
+
+        entry = self._sessions.get(session_id, {}).get(key)
+        if entry is not None:
+            self._sessions[session_id][key] = (entry[0], entry[1], time.monotonic(), entry[3])
+
+    def _over_budget(self, session_id):
+        if self.session_budget is not None and self._totals.get(session_id, 0) > self.session_budget:
+            return True
+
+        if self.global_budget is not None and sum(self._totals.values()) > self.global_budget:
+            return True
+
+        return False
+
+    def _enforce(self, session_id, session_state, spillable_keys):
+        if not self._over_budget(session_id):
+            return
+
+        usage = self._sessions[session_id]
+        candidates = sorted((entry[2], key) for key, entry in usage.items()
+                            if entry[1] >= self.spill_threshold and key in spillable_keys)
+
+        for last_used, key in candidates:
+            if not self._over_budget(session_id):
+                break
+
+            self._spill(session_id, session_state, key)
+
+    def _spill(self, session_id, session_state, key):
+        value = session_state[key]
+        entry = self._sessions[session_id][key]
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, '{}.gz'.format(uuid.uuid4().hex))
+
+        try:
+            cp.dump(value, path, compression='gzip')
+            placeholder = SpilledValue(path, entry[1], type(value).__name__)
+            session_state[key] = placeholder
+        except Exception:
+            # unpicklable values, or widget values Streamlit won't let us replace, stay in memory
+            self._remove_file(path)
+            return
+
+        with self._lock:
+            self._spill_paths.setdefault(session_id, {})[key] = path
+            self._sessions[session_id][key] = (id(placeholder), 0, entry[2], entry[1])
+            self._totals[session_id] -= entry[1]
+            self._spill_count += 1
+
+    def load(self, session_id, session_state, key):
+        """
+        Return the value for the key, reading it back from the disk cache and restoring it to the session store if it had been spilled.
+        A KeyError is raised if the spilled value has been removed while the session was idle, the placeholder is deleted along with it.
+        """
+
+        value = session_state[key]
+
+        if isinstance(value, SpilledValue):
+            placeholder = value
+
+            try:
+                value = placeholder.load()
+            except FileNotFoundError:
+                del session_state[key]
+                self._spill_paths.get(session_id, {}).pop(key, None)
+                raise KeyError(key) from None
+
+            session_state[key] = value
+            placeholder.discard()
+            self._spill_paths.get(session_id, {}).pop(key, None)
+
+            size = placeholder.size
+            with self._lock:
+                self._sessions.setdefault(session_id, {})[key] = (id(value), size, time.monotonic(), 0)
+                self._totals[session_id] = self._totals.get(session_id, 0) + size
+        else:
+            self.touch(session_id, key)
+
+        return value
+
+    def _forget_idle_sessions(self, now):
+        for session_id in [s for s, t in self._last_seen.items() if now - t > self.session_timeout]:
+            self._last_seen.pop(session_id, None)
+            self._totals.pop(session_id, None)
+            self._sessions.pop(session_id, None)
+
+            for path in self._spill_paths.pop(session_id, {}).values():
+                self._remove_file(path)
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def usage(self, session_id=None):
+        """
+        Return the memory usage metrics.
+
+        Parameters
+        ------------
+        session_id: str, None
+            If provided, include the size of each key within this session.
+
+        Returns
+        ---------
+        dict: the total bytes held by all sessions, the bytes held by each session, the bytes currently spilled to disk and the number of values spilled so far.
+        """
+
+        with self._lock:
+            metrics = {'global': sum(self._totals.values()),
+                       'sessions': dict(self._totals),
+                       'spilled_bytes': sum(e[3] for usage in self._sessions.values() for e in usage.values()),
+                       'spill_count': self._spill_count}
+
+            if session_id is not None:
+                metrics['keys'] = {key: entry[1] or entry[3] for key, entry in self._sessions.get(session_id, {}).items()}
+
+        return metrics
+
+
+_MANAGER = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_session_memory_manager(**options):
+    """
+    Return the process wide session memory manager, it is created with the options given on the first call.
+    """
+
+    global _MANAGER
+
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                _MANAGER = SessionMemoryManager(**options)
+
+    return _MANAGER
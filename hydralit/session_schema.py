@@ -0,0 +1,113 @@
+class SessionParam(object):
+    """
+    The declaration of a single user session parameter, used as a value within the session_params Dict given to HydraApp.
+    """
+
+    __slots__ = ('default', 'type', 'validator', 'allow_none', 'spillable')
+
+    def __init__(self, default=None, type=None, validator=None, allow_none=True, spillable=False):
+        """
+        Parameters
+        ------------
+        default: object, None
+            The value the parameter starts with in each new session.
+        type: type or tuple of types, None
+            The type(s) the value must be an instance of, if None any type is allowed.
+        validator: callable, None
+            A function taking the value that returns False (or raises a ValueError) if the value is not allowed.
+        allow_none: bool, True
+            Allow the parameter to be set to None regardless of the type.
+        spillable: bool, False
+            Allow a large value of this parameter to be written to disk when the session is over its memory budget. The apps must then read the parameter with get_session_value, a direct read of the session store returns a placeholder while the value is on disk.
+        """
+
+        self.default = default
+        self.type = type
+        self.validator = validator
+        self.allow_none = allow_none
+        self.spillable = spillable
+
+    def validate(self, name, value):
+        """
+        Check the value is allowed for this parameter, raising a TypeError or ValueError if not.
+        """
+
+        if value is None and self.allow_none:
+            return
+
+        if self.type is not None and not isinstance(value, self.type):
+            raise TypeError('Session parameter {} must be of type {}, not {}.'.format(
+                repr(name), getattr(self.type, '__name__', self.type), type(value).__name__))
+
+        if self.validator is not None and self.validator(value) is False:
+            raise ValueError('Invalid value for session parameter {}: {}'.format(repr(name), repr(value)))
+
+
+class SessionSchema(object):
+    """
+    The compiled set of user session parameters, plain default values in the session_params Dict are treated as untyped parameters.
+    """
+
+    def __init__(self, session_params=None):
+        self._params = {}
+
+        if session_params is not None:
+            for name, param in session_params.items():
+                if not isinstance(param, SessionParam):
+                    param = SessionParam(default=param)
+                self._params[name] = param
+
+        self.keys = tuple(self._params.keys())
+        self.spillable_keys = frozenset(name for name, param in self._params.items() if param.spillable)
+
+    def __contains__(self, name):
+        return name in self._params
+
+    def __len__(self):
+        return len(self._params)
+
+    def defaults(self):
+        return {name: param.default for name, param in self._params.items()}
+
+    def validate(self, values):
+        """
+        Check every value in the Dict against its parameter declaration, raising a KeyError for unknown parameters or a TypeError or ValueError for invalid values.
+        """
+
+        for name, value in values.items():
+            param = self._params.get(name)
+            if param is None:
+                raise KeyError('{} is not a declared session parameter.'.format(repr(name)))
+
+            param.validate(name, value)
+
+    def snapshot(self, session_state):
+        return {name: session_state[name] for name in self.keys if name in session_state}
+
+    def changed(self, baseline, session_state):
+        """
+        Return the names of the parameters whose value in the session store is no longer the value held in the baseline snapshot.
+        """
+
+        changed = set()
+        for name in self.keys:
+            if name not in session_state:
+                continue
+
+            value = session_state[name]
+            if name not in baseline:
+                changed.add(name)
+                continue
+
+            old_value = baseline[name]
+            if value is old_value:
+                continue
+
+            try:
+                if bool(value != old_value):
+                    changed.add(name)
+            except Exception:
+                # values without a simple equality (arrays, frames), a new object counts as a change
+                changed.add(name)
+
+        return changed
@@ -0,0 +1,173 @@
+import threading
+
+
+class TenantConfig(object):
+    """
+    The branding, app subset and access rules of a single portal served by a shared HydraApp process.
+    """
+
+    def __init__(self, name, hosts=(), title=None, favicon=None, navbar_theme=None, banners=None, banner_spacing=None,
+                 apps=None, access_levels=None):
+        """
+        Parameters
+        ------------
+        name: str
+            The unique name of the tenant, also the value of the url parameter that selects it on hosts that no tenant claims.
+        hosts: collection of str
+            The host names (without the port) that select this tenant, a request to one of these hosts always gets this tenant.
+        title: str, None
+            The page title, if None the title given to HydraApp is used.
+        favicon: str, None
+            The favicon, if None the favicon given to HydraApp is used.
+        navbar_theme: Dict, None
+            The Hydralit Navbar theme overrides, if None the theme given to HydraApp is used.
+        banners: str or Array, None
+            The banner image(s), if None the banners given to HydraApp are used.
+        banner_spacing: Array, None
+            The banner column spacing, if None the spacing given to HydraApp is used.
+        apps: collection of str, None
+            The titles of the apps this tenant offers, apps added to the HydraApp that are not in this collection are left out. If None, every app is offered.
+        access_levels: Dict, None
+            Overrides of the access level of apps for this tenant, keyed by app title.
+        """
+
+        self.name = name
+        self.hosts = tuple(h.lower() for h in hosts)
+        self.title = title
+        self.favicon = favicon
+        self.navbar_theme = navbar_theme
+        self.banners = banners
+        self.banner_spacing = banner_spacing
+        self.apps = None if apps is None else frozenset(apps)
+        self.access_levels = dict(access_levels or {})
+
+    def includes(self, app_title):
+        return self.apps is None or app_title in self.apps
+
+    def signature(self):
+        """
+        Return a hashable summary of the whole configuration, two configurations with the same signature serve the same portal.
+        """
+
+        return (self.name, self.hosts, self.title, self.favicon, _freeze(self.navbar_theme), _freeze(self.banners),
+                _freeze(self.banner_spacing), None if self.apps is None else tuple(sorted(self.apps)), _freeze(self.access_levels))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    else:
+        return value
+
+    def prune_nav(self, nav_spec):
+        """
+        Return the complex nav specification with the apps this tenant doesn't offer removed, along with any sections left empty.
+        """
+
+        if self.apps is None:
+            return nav_spec
+
+        if isinstance(nav_spec, dict):
+            pruned = {}
+            for section, items in nav_spec.items():
+                items = self.prune_nav(items)
+                if items:
+                    pruned[section] = items
+            return pruned
+
+        pruned = []
+        for item in nav_spec:
+            if isinstance(item, dict):
+                item = self.prune_nav(item)
+                if item:
+                    pruned.append(item)
+            elif item in self.apps:
+                pruned.append(item)
+
+        return pruned
+
+
+class TenantRegistry(object):
+    """
+    The tenant configurations, indexed by name and host so each rerun resolves its tenant with a couple of dict lookups.
+    """
+
+    def __init__(self, tenants=(), default=None, param='tenant'):
+        """
+        Parameters
+        ------------
+        tenants: collection of TenantConfig
+            The tenants to serve.
+        default: str, None
+            The name of the tenant used when a request matches no tenant, if None the plain HydraApp configuration is used.
+        param: str, 'tenant'
+            The url query parameter that selects a tenant by name, only honoured on hosts that no tenant claims, so a visitor can't switch to another tenant's apps and access rules.
+        """
+
+        self.default = default
+        self.param = param
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._by_host = {}
+
+        for tenant in tenants:
+            self.register(tenant)
+
+    def register(self, tenant):
+        with self._lock:
+            self._by_name[tenant.name] = tenant
+            for host in tenant.hosts:
+                self._by_host[host] = tenant
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def names(self):
+        return list(self._by_name.keys())
+
+    def resolve(self, name=None, host=None):
+        """
+        Return the tenant for a request, selected by the host name first, then by name (from the url parameter) if no tenant claims the host, then the default.
+        """
+
+        if host is not None:
+            tenant = self._by_host.get(host.split(':')[0].lower())
+            if tenant is not None:
+                return tenant
+
+        if name is not None:
+            tenant = self._by_name.get(name)
+            if tenant is not None:
+                return tenant
+
+        return self._by_name.get(self.default)
+
+
+# process wide registries built from lists of configurations, so a list declared in the main script is only indexed once,
+# keyed by the tenant names and holding the signature of the configurations the registry was built from
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_tenant_registry(tenants):
+    """
+    Return a TenantRegistry for the tenants, a registry is passed straight through, a list of TenantConfig is indexed once per process and indexed again when any of the configurations change, such as the hosts, apps or access levels of a tenant.
+    """
+
+    if isinstance(tenants, TenantRegistry):
+        return tenants
+
+    key = tuple(tenant.name for tenant in tenants)
+    signature = tuple(tenant.signature() for tenant in tenants)
+    entry = _REGISTRIES.get(key)
+
+    if entry is None or entry[0] != signature:
+        with _REGISTRIES_LOCK:
+            entry = _REGISTRIES.get(key)
+            if entry is None or entry[0] != signature:
+                entry = (signature, TenantRegistry(tenants))
+                _REGISTRIES[key] = entry
+
+    return entry[1]
@@ -0,0 +1,386 @@
+import collections
+import functools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from hydralit.circuit_breaker import is_script_control
+
+
+STATUS_UNSET = 'STATUS_CODE_UNSET'
+STATUS_OK = 'STATUS_CODE_OK'
+STATUS_ERROR = 'STATUS_CODE_ERROR'
+
+
+def _otel_value(value):
+    # the typed attribute values of the OpenTelemetry JSON encoding
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    elif isinstance(value, int):
+        return {'intValue': str(value)}
+    elif isinstance(value, float):
+        return {'doubleValue': value}
+    else:
+        return {'stringValue': str(value)}
+
+
+def _otel_attributes(attributes):
+    return [{'key': key, 'value': _otel_value(value)} for key, value in attributes.items()]
+
+
+class Span(object):
+    """
+    A single timed operation within a trace, following the OpenTelemetry span data model.
+    """
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_span_id', 'attributes', 'events', 'status', 'status_message',
+                 'start_time', 'end_time', '_start')
+
+    def __init__(self, name, trace_id, parent_span_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self._start = time.perf_counter()
+
+    @property
+    def duration(self):
+        """
+        The length of the span in seconds, up to now if it has not ended.
+        """
+
+        if self.end_time is None:
+            return time.perf_counter() - self._start
+
+        return (self.end_time - self.start_time) / 1e9
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, **attributes):
+        self.events.append((name, time.time_ns(), attributes))
+
+    def record_exception(self, e):
+        self.add_event('exception', **{'exception.type': type(e).__name__, 'exception.message': str(e)})
+        self.status = STATUS_ERROR
+        self.status_message = '{}: {}'.format(type(e).__name__, e)
+
+    def end(self):
+        if self.end_time is None:
+            self.end_time = self.start_time + int((time.perf_counter() - self._start) * 1e9)
+
+    def to_dict(self):
+        """
+        Return the span in the OpenTelemetry JSON encoding.
+        """
+
+        span = {'traceId': self.trace_id, 'spanId': self.span_id, 'name': self.name, 'kind': 'SPAN_KIND_INTERNAL',
+                'startTimeUnixNano': str(self.start_time), 'endTimeUnixNano': str(self.end_time or self.start_time),
+                'attributes': _otel_attributes(self.attributes),
+                'events': [{'name': name, 'timeUnixNano': str(t), 'attributes': _otel_attributes(a)} for name, t, a in self.events],
+                'status': {'code': self.status}}
+
+        if self.parent_span_id is not None:
+            span['parentSpanId'] = self.parent_span_id
+
+        if self.status_message is not None:
+            span['status']['message'] = self.status_message
+
+        return span
+
+
+class _NoopSpan(object):
+    """
+    Stands in for a span when tracing is off, so app code can use the span without checking.
+    """
+
+    name = None
+    duration = 0.0
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def record_exception(self, e):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope(object):
+    # the context manager returned by Tracer.span, it makes the span the parent of any spans started within it on the same thread
+
+    def __init__(self, tracer, span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self):
+        self._tracer._stack().append(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        stack = self._tracer._stack()
+        if stack and stack[-1] is self._span:
+            stack.pop()
+
+        if exc_value is not None:
+            if is_script_control(exc_value):
+                self._span.set_attribute('hydralit.script_control', type(exc_value).__name__)
+            else:
+                self._span.record_exception(exc_value)
+
+        self._span.end()
+        return False
+
+
+class Tracer(object):
+    """
+    Collects the spans of a single trace, each Streamlit script run is one trace with a root span covering the whole run.
+    """
+
+    def __init__(self, collector, name='hydralit.run', attributes=None):
+        self.collector = collector
+        self.trace_id = uuid.uuid4().hex
+        self.spans = []
+        self.finished = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.root = self._new_span(name, None, attributes)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _new_span(self, name, parent_span_id, attributes):
+        span = Span(name, self.trace_id, parent_span_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def span(self, name, **attributes):
+        """
+        Return a context manager that times a child span of the current span, spans started on other threads are children of the root span.
+        """
+
+        if self.finished:
+            # late work, such as a fragment rerun, after the trace has been exported
+            return NOOP_SPAN
+
+        stack = self._stack()
+        parent = stack[-1] if stack else self.root
+
+        return _SpanScope(self, self._new_span(name, parent.span_id, attributes))
+
+    def root_scope(self):
+        return _SpanScope(self, self.root)
+
+    def is_error(self):
+        return any(span.status == STATUS_ERROR for span in self.spans)
+
+    def finish(self):
+        """
+        End the root span and hand the trace to the collector.
+        """
+
+        if self.finished:
+            return
+
+        self.finished = True
+        self.root.end()
+        self.collector.submit(self)
+
+    def to_dict(self, resource_attributes=None):
+        """
+        Return the trace in the OpenTelemetry (OTLP) JSON encoding.
+        """
+
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+
+        return {'resourceSpans': [{'resource': {'attributes': _otel_attributes(resource_attributes or {})},
+                                   'scopeSpans': [{'scope': {'name': 'hydralit'}, 'spans': spans}]}]}
+
+
+def traced(name):
+    """
+    A decorator that runs a HydraApp method within a span of the current trace, if tracing is on.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, '_tracer', None)
+            if tracer is None:
+                return method(self, *args, **kwargs)
+
+            with tracer.span(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TailSampler(object):
+    """
+    Decides which traces to keep once they have finished, all errored and slow runs are kept along with a random sample of the rest.
+    """
+
+    def __init__(self, slow_threshold=1.0, sample_rate=0.0):
+        """
+        Parameters
+        ------------
+        slow_threshold: float, 1.0
+            Runs taking at least this many seconds are always kept.
+        sample_rate: float, 0.0
+            The fraction of the remaining runs to keep.
+        """
+
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+
+    def keep(self, tracer):
+        if tracer.is_error():
+            return True
+
+        if self.slow_threshold is not None and tracer.root.duration >= self.slow_threshold:
+            return True
+
+        return random.random() < self.sample_rate
+
+
+class InMemoryExporter(object):
+    """
+    Keeps the most recent sampled traces in process, for inspection from an admin app or a test.
+    """
+
+    def __init__(self, max_traces=200):
+        self._traces = collections.deque(maxlen=max_traces)
+
+    def export(self, trace):
+        self._traces.append(trace)
+
+    def traces(self):
+        """
+        Return the kept traces, oldest first, each in the OpenTelemetry JSON encoding.
+        """
+
+        return list(self._traces)
+
+    def clear(self):
+        self._traces.clear()
+
+
+class FileExporter(object):
+    """
+    Appends each sampled trace to a local file as one line of OpenTelemetry (OTLP) JSON, the format read by the file receiver of the OpenTelemetry collector.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, trace):
+        line = json.dumps(trace, separators=(',', ':'))
+
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class TraceCollector(object):
+    """
+    Receives finished traces, applies the tail sampling decision and exports the traces that are kept.
+    """
+
+    def __init__(self, exporter, sampler=None, service_name='hydralit'):
+        self.exporter = exporter
+        self.sampler = sampler or TailSampler()
+        self.resource_attributes = {'service.name': service_name, 'process.pid': os.getpid()}
+        self.submitted = 0
+        self.kept = 0
+
+    def submit(self, tracer):
+        self.submitted += 1
+
+        if not self.sampler.keep(tracer):
+            return
+
+        self.kept += 1
+        try:
+            self.exporter.export(tracer.to_dict(self.resource_attributes))
+        except Exception:
+            # a failing exporter must never break the app being traced
+            pass
+
+
+# process wide collectors, keyed by the exporter they write to, so every rerun shares the sampling counts and in-process traces.
+# exporter objects are keyed by their type (or their own key attribute), as the main script creates a new instance on every rerun
+_COLLECTORS = {}
+_COLLECTORS_LOCK = threading.Lock()
+
+
+def get_trace_collector(exporter, slow_threshold=1.0, sample_rate=0.0):
+    """
+    Return the process wide collector for the exporter, creating it on the first call.
+
+    Parameters
+    ------------
+    exporter: str or object
+        'memory' to keep the traces in process, a file path to append the traces to, or any object with an export(trace) method. Objects of the same type share one collector, which sends to the latest instance passed in, give an object a key attribute to keep a separate collector for it.
+    slow_threshold: float, 1.0
+        Runs taking at least this many seconds are always kept.
+    sample_rate: float, 0.0
+        The fraction of the other runs without errors to keep.
+    """
+
+    if isinstance(exporter, str):
+        key = exporter
+    else:
+        key = getattr(exporter, 'key', None) or (type(exporter).__module__, type(exporter).__qualname__)
+
+    collector = _COLLECTORS.get(key)
+
+    if collector is None:
+        with _COLLECTORS_LOCK:
+            collector = _COLLECTORS.get(key)
+
+            if collector is None:
+                if exporter == 'memory':
+                    exporter = InMemoryExporter()
+                elif isinstance(exporter, str):
+                    exporter = FileExporter(exporter)
+
+                collector = TraceCollector(exporter, TailSampler(slow_threshold, sample_rate))
+                _COLLECTORS[key] = collector
+                return collector
+
+    if not isinstance(exporter, str):
+        collector.exporter = exporter
+
+    return collector
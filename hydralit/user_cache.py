@@ -0,0 +1,141 @@
+import collections
+import threading
+import time
+
+
+class UserScopedCache(object):
+    """
+    A process wide cache where every entry is scoped to a (user, access level, app) triple, so results computed for one user are never served to another.
+
+    Entries are indexed by user, allowing all the entries for a user to be dropped when they log in, log out or the session switches to a different user, the least recently used entries are evicted once the cache is full.
+    """
+
+    def __init__(self, max_entries=4096, ttl=None):
+        """
+        Parameters
+        ------------
+        max_entries: int, 4096
+            The maximum number of entries to hold across all users.
+        ttl: float, None
+            The default number of seconds an entry is valid for, None for no expiry.
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._entries = collections.OrderedDict()
+        self._by_user = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, scope, key, default=None):
+        """
+        Return the cached value for the key within the scope, or the default if there is no valid entry.
+        """
+
+        full_key = (scope, key)
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                if entry is not None:
+                    self._remove(full_key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, scope, key, value, ttl=None):
+        """
+        Cache a value for the key within the scope.
+        """
+
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        full_key = (scope, key)
+
+        with self._lock:
+            self._entries[full_key] = (value, expires)
+            self._entries.move_to_end(full_key)
+            self._by_user.setdefault(scope[0], set()).add(full_key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def get_or_compute(self, scope, key, func, *args, ttl=None, **kwargs):
+        """
+        Return the cached value for the key within the scope, calling func(*args, **kwargs) and caching the result if there is no valid entry.
+        """
+
+        missing = object()
+        value = self.get(scope, key, missing)
+
+        if value is missing:
+            value = func(*args, **kwargs)
+            self.set(scope, key, value, ttl=ttl)
+
+        return value
+
+    def _remove(self, full_key):
+        self._entries.pop(full_key, None)
+
+        user_keys = self._by_user.get(full_key[0][0])
+        if user_keys is not None:
+            user_keys.discard(full_key)
+            if not user_keys:
+                del self._by_user[full_key[0][0]]
+
+    def invalidate_user(self, user):
+        """
+        Drop every entry cached for the user, across all access levels and apps.
+        """
+
+        with self._lock:
+            for full_key in list(self._by_user.get(user, ())):
+                self._remove(full_key)
+
+    def invalidate_app(self, app_name):
+        """
+        Drop every entry cached for the app, across all users.
+        """
+
+        with self._lock:
+            for full_key in [k for k in self._entries if k[0][2] == app_name]:
+                self._remove(full_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self):
+        """
+        Return the number of entries, users, hits and misses.
+        """
+
+        return {'entries': len(self._entries), 'users': len(self._by_user), 'hits': self.hits, 'misses': self.misses}
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_user_cache():
+    """
+    Return the process wide user scoped cache.
+    """
+
+    global _CACHE
+
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = UserScopedCache()
+
+    return _CACHE
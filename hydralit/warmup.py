@@ -0,0 +1,139 @@
+import collections
+import threading
+import time
+from hydralit.circuit_breaker import Watchdog, AppTimeoutError
+
+
+# how long past its time limit an app is waited on for the watchdog interrupt to land, before it is given up as stuck
+_STUCK_GRACE = 5.0
+
+
+class WarmupRun(object):
+    """
+    A single warm-up of a set of child apps, the warmup() hook of each app is run on its own thread, at most parallelism at a time, with a time limit for each app.
+
+    The run is ready once every app has finished, failed or used up its time limit, a failed or timed out app does not hold back the others. An app stuck where the time limit interrupt can't land (within a C call) is left running on its daemon thread and its slot is handed to the next app.
+    """
+
+    def __init__(self, apps, parallelism=4, timeout=60):
+        """
+        Parameters
+        ------------
+        apps: list of (str, HydraHeadApp)
+            The names and instances of the apps to warm up.
+        parallelism: int, 4
+            The number of apps to warm up at the same time.
+        timeout: float, 60
+            The number of seconds each app is allowed for its warm-up, None for no limit.
+        """
+
+        self.apps = list(apps)
+        self.parallelism = max(1, int(parallelism))
+        self.timeout = timeout
+        self.started_at = None
+        self.duration = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._report = {app_name: {'status': 'pending', 'duration': None, 'error': None} for app_name, app in self.apps}
+
+    def start(self):
+        self.started_at = time.time()
+        thread = threading.Thread(target=self._run_all, name='hydralit-warmup', daemon=True)
+        thread.start()
+
+    def _run_all(self):
+        start = time.perf_counter()
+        pending = collections.deque(self.apps)
+        running = {}
+
+        try:
+            while pending or running:
+                now = time.perf_counter()
+
+                for app_name, (thread, started) in list(running.items()):
+                    if not thread.is_alive():
+                        del running[app_name]
+                    elif self.timeout is not None and now - started > self.timeout + _STUCK_GRACE:
+                        self._set_result(app_name, 'timeout', now - started,
+                                         'Did not return within the warm-up time limit of {} seconds.'.format(self.timeout))
+                        del running[app_name]
+
+                while pending and len(running) < self.parallelism:
+                    app_name, app = pending.popleft()
+                    thread = threading.Thread(target=self._run_one, args=(app_name, app), name='hydralit-warmup-{}'.format(app_name), daemon=True)
+                    running[app_name] = (thread, time.perf_counter())
+                    thread.start()
+
+                if running:
+                    self._wake.wait(0.1)
+                    self._wake.clear()
+        finally:
+            self.duration = time.perf_counter() - start
+            self._ready.set()
+
+    def _run_one(self, app_name, app):
+        self._set_result(app_name, 'running')
+        watchdog = Watchdog(self.timeout, app_name)
+
+        try:
+            with watchdog:
+                app.warmup()
+        except AppTimeoutError:
+            self._set_result(app_name, 'timeout', watchdog.elapsed, 'Exceeded the warm-up time limit of {} seconds.'.format(self.timeout))
+        except Exception as e:
+            self._set_result(app_name, 'failed', watchdog.elapsed, '{}: {}'.format(type(e).__name__, e))
+        else:
+            self._set_result(app_name, 'timeout' if watchdog.timed_out else 'ok', watchdog.elapsed)
+        finally:
+            self._wake.set()
+
+    def _set_result(self, app_name, status, duration=None, error=None):
+        with self._lock:
+            # an app given up as stuck keeps its timeout, even if it does return in the end
+            if status != 'running' and self._report[app_name]['status'] not in ('pending', 'running'):
+                return
+
+            self._report[app_name] = {'status': status, 'duration': duration, 'error': error}
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the warm-up has finished, returning True if it is ready.
+        """
+
+        return self._ready.wait(timeout)
+
+    def report(self):
+        """
+        Return the status ('pending', 'running', 'ok', 'failed' or 'timeout'), duration in seconds and any error message for each app.
+        """
+
+        with self._lock:
+            return {app_name: dict(result) for app_name, result in self._report.items()}
+
+
+# the warm-up runs once per process for each set of registered apps, HydraApp is recreated on every rerun
+_RUNS = {}
+_RUNS_LOCK = threading.Lock()
+
+
+def get_warmup(key, apps, parallelism=4, timeout=60):
+    """
+    Return the process wide warm-up for the key, starting it with the given apps on the first call.
+    """
+
+    warmup_run = _RUNS.get(key)
+
+    if warmup_run is None:
+        with _RUNS_LOCK:
+            warmup_run = _RUNS.get(key)
+
+            if warmup_run is None:
+                warmup_run = WarmupRun(apps, parallelism=parallelism, timeout=timeout)
+                warmup_run.start()
+                _RUNS[key] = warmup_run
+
+    return warmup_run
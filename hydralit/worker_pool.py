@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# process wide pool shared by the panels of composite views and the sections of progressive pages
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_POOL_SIZE = 8
+
+
+def _script_run_ctx_api():
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    except ImportError:
+        from streamlit.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    try:
+        from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+    except ImportError:
+        SCRIPT_RUN_CONTEXT_ATTR_NAME = 'streamlit_script_run_ctx'
+
+    return add_script_run_ctx, get_script_run_ctx, SCRIPT_RUN_CONTEXT_ATTR_NAME
+
+
+def set_worker_pool_size(size):
+    """
+    Set the number of threads in the shared worker pool, a pool already running with a different size is replaced, the work already given to it still finishes.
+    """
+
+    global _POOL, _POOL_SIZE
+
+    with _POOL_LOCK:
+        size = max(1, int(size))
+        if size == _POOL_SIZE:
+            return
+
+        _POOL_SIZE = size
+        if _POOL is not None:
+            _POOL.shutdown(wait=False)
+            _POOL = None
+
+
+def get_worker_pool():
+    """
+    Return the process wide worker pool, creating it on the first call.
+    """
+
+    global _POOL
+
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix='hydralit-worker')
+
+    return _POOL
+
+
+def submit(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) in the shared worker pool with the script run context of the calling session attached, so st.cache_data and the session state work as they do on the script thread.
+
+    The function must still not draw any Streamlit elements, the order of elements drawn from several threads at once is undefined.
+
+    Returns
+    ---------
+    Future: the future of the call.
+    """
+
+    add_script_run_ctx, get_script_run_ctx, ctx_attr_name = _script_run_ctx_api()
+    ctx = get_script_run_ctx()
+
+    def run_with_ctx():
+        thread = threading.current_thread()
+        if ctx is not None:
+            add_script_run_ctx(thread, ctx)
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # pool threads are reused by other sessions, never leave a session's context behind
+            setattr(thread, ctx_attr_name, None)
+
+    return get_worker_pool().submit(run_with_ctx)